@@ -0,0 +1,47 @@
+from database.database_manager import PAGE_SIZE
+from controllers.book_controller import BookController
+from controllers.reader_controller import ReaderController
+from controllers.loan_controller import LoanController
+
+
+class _AsyncController:
+    # Wraps a synchronous controller bound to the AsyncDatabaseManager's
+    # pooled manager; every method becomes a coroutine run on its executor
+    _controller_type = None
+
+    def __init__(self, async_db) -> None:
+        self.adb = async_db
+        self.controller = self._controller_type(async_db.db)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        method = getattr(self.controller, name)
+
+        async def call(*args, **kwargs):
+            return await self.adb.call(method, *args, **kwargs)
+        return call
+
+
+class AsyncBookController(_AsyncController):
+    _controller_type = BookController
+
+    def iter_books(self, batch_size=PAGE_SIZE):
+        return self.adb.iter_books(batch_size)
+
+
+class AsyncReaderController(_AsyncController):
+    _controller_type = ReaderController
+
+    def iter_readers(self, batch_size=PAGE_SIZE):
+        return self.adb.iter_readers(batch_size)
+
+
+class AsyncLoanController(_AsyncController):
+    _controller_type = LoanController
+
+    def iter_loans(self, batch_size=PAGE_SIZE):
+        return self.adb.iter_loans(batch_size)
+
+    def iter_loan_details(self, batch_size=PAGE_SIZE, **filters):
+        return self.adb.iter_loan_details(batch_size, **filters)
@@ -1,3 +1,4 @@
+from database.database_manager import BULK_CHUNK_SIZE, PAGE_SIZE, SEARCH_LIMIT
 from models.book import Book
 
 class BookController:
@@ -8,29 +9,40 @@ class BookController:
         book = Book(title, author, isbn, year, quantity)
         return self.db.add_book(book)
 
+    def add_books_many(self, books, chunk_size=BULK_CHUNK_SIZE) -> list[int]:
+        # Validation runs lazily, so generators are consumed chunk by chunk
+        models = (Book(**book) for book in books)
+        return self.db.add_books_many(models, chunk_size)
+
     def get_book(self, book_id) -> Book | None:
         return self.db.get_book_by_id(book_id)
 
     def get_all_books(self) -> list[Book]:
         return self.db.get_all_books()
 
+    def list_books(self, after_id=0, limit=PAGE_SIZE, offset=0) -> list[Book]:
+        return self.db.list_books(after_id, limit, offset=offset)
+
+    def count_books(self) -> int:
+        return self.db.count_books()
+
+    def iter_books(self, batch_size=PAGE_SIZE):
+        return self.db.iter_books(batch_size)
+
     def update_book(self, book_id, **kwargs) -> bool:
         return self.db.update_book(book_id, **kwargs)
 
     def delete_book(self, book_id) -> bool:
         return self.db.delete_book(book_id)
 
-    def search_books(self, query) -> list[Book]:
-        return self.db.search_books(query)
+    def search_books(self, query, limit=SEARCH_LIMIT, offset=0) -> list[Book]:
+        return self.db.search_books(query, limit, offset)
+
+    def search_available_books(self, prefix, limit=SEARCH_LIMIT) -> list[Book]:
+        return self.db.search_available_books(prefix, limit)
 
     def borrow_book(self, book_id) -> bool:
-        book = self.db.get_book_by_id(book_id)
-        if book and book.borrow_book():
-            return self.db.update_book(book_id, available=book.available)
-        return False
+        return self.db.decrement_available(book_id)
 
     def return_book(self, book_id) -> bool:
-        book = self.db.get_book_by_id(book_id)
-        if book and book.return_book():
-            return self.db.update_book(book_id, available=book.available)
-        return False
+        return self.db.increment_available(book_id)
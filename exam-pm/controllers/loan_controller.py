@@ -1,29 +1,119 @@
 from datetime import datetime, timedelta
+from database.database_manager import BULK_CHUNK_SIZE, PAGE_SIZE
+from database.tables import LoanTable
 from models.loan import Loan
 
+
+def _classify(is_returned, return_date, as_of) -> tuple[str, int]:
+    if is_returned:
+        return "returned", 0
+    if as_of > return_date:
+        return "overdue", (as_of - return_date).days
+    return "active", 0
+
+
 class LoanController:
     def __init__(self, db_manager) -> None:
         self.db = db_manager
 
-    def create_loan(self, book_id, reader_id, loan_date=None, return_date=None) -> int:
+    def _build_loan(self, book_id, reader_id, loan_date=None, return_date=None) -> Loan:
         if loan_date is None:
             loan_date = datetime.now()
         if return_date is None:
             return_date = loan_date + timedelta(days=14)  # 2 weeks loan period
-        loan = Loan(book_id, reader_id, loan_date, return_date)
+        return Loan(book_id, reader_id, loan_date, return_date)
+
+    def create_loan(self, book_id, reader_id, loan_date=None, return_date=None) -> int:
+        loan = self._build_loan(book_id, reader_id, loan_date, return_date)
         return self.db.add_loan(loan)
 
+    def create_loans_many(self, loans, chunk_size=BULK_CHUNK_SIZE) -> list[int]:
+        models = (self._build_loan(**loan) for loan in loans)
+        return self.db.add_loans_many(models, chunk_size)
+
+    def checkout(self, book_id, reader_id, loan_date=None, return_date=None) -> int:
+        loan = self._build_loan(book_id, reader_id, loan_date, return_date)
+        with self.db.transaction():
+            # Foreign keys are not enforced (loans outlive deleted books)
+            if self.db.get_reader_by_id(reader_id) is None:
+                raise ValueError("Reader not found")
+            if not self.db.decrement_available(book_id):
+                raise ValueError("Book is not available")
+            return self.db.add_loan(loan)
+
+    def checkout_many(self, loans) -> list[int]:
+        # All or nothing: one unavailable book rolls back the whole batch
+        with self.db.transaction():
+            return [self.checkout(**loan) for loan in loans]
+
+    def checkin(self, loan_id) -> bool:
+        with self.db.transaction():
+            book_id = self.db.mark_loan_returned(loan_id)
+            if book_id is None:
+                return False
+            self.db.increment_available(book_id)
+            return True
+
     def get_loan(self, loan_id) -> Loan | None:
         return self.db.get_loan_by_id(loan_id)
 
     def get_all_loans(self) -> list[Loan]:
         return self.db.get_all_loans()
 
+    def list_loans(self, after_id=0, limit=PAGE_SIZE, offset=0) -> list[Loan]:
+        return self.db.list_loans(after_id, limit, offset=offset)
+
+    def iter_loans(self, batch_size=PAGE_SIZE):
+        return self.db.iter_loans(batch_size)
+
+    def get_loans(self, status=None, reader_id=None, book_id=None, due_before=None,
+                  limit=PAGE_SIZE, after_id=0) -> list[Loan]:
+        return self.db.get_loans(status, reader_id, book_id, due_before, limit, after_id)
+
+    def list_loan_details(self, status=None, reader_id=None, book_id=None, due_before=None,
+                          limit=PAGE_SIZE, after_id=0, offset=0) -> list[dict]:
+        return self.db.list_loan_details(
+            status, reader_id, book_id, due_before, limit, after_id, offset
+        )
+
+    def get_loan_details(self, loan_id) -> dict | None:
+        return self.db.get_loan_details(loan_id)
+
+    def count_loans(self, status=None, reader_id=None, book_id=None, due_before=None) -> int:
+        return self.db.count_loans(status, reader_id, book_id, due_before)
+
+    def iter_loan_details(self, batch_size=PAGE_SIZE, **filters):
+        return self.db.iter_loan_details(batch_size, **filters)
+
+    def classify(self, loans, as_of=None) -> list[tuple[str, int]]:
+        # (status, days overdue) for each loan, evaluated against one clock;
+        # accepts Loan objects, list_loan_details() rows or a LoanTable
+        if as_of is None:
+            as_of = datetime.now()
+        if isinstance(loans, LoanTable):
+            return list(zip(*loans.classify(as_of)))
+        return [
+            _classify(loan["is_returned"], loan["return_date"], as_of) if isinstance(loan, dict)
+            else _classify(loan.is_returned, loan.return_date, as_of)
+            for loan in loans
+        ]
+
+    def matches_status(self, loan, status, as_of=None) -> bool:
+        # Whether a list_loan_details() row is listed under status (None for
+        # all): the same rule as the SQL filter, so "active" covers every
+        # open loan, overdue ones included
+        if status is None:
+            return True
+        if status == "overdue":
+            if as_of is None:
+                as_of = datetime.now()
+            return _classify(loan["is_returned"], loan["return_date"], as_of)[0] == "overdue"
+        if status not in ("active", "returned"):
+            raise ValueError(f"Unknown loan status: {status}")
+        return bool(loan["is_returned"]) == (status == "returned")
+
     def return_book(self, loan_id) -> bool:
-        loan = self.db.get_loan_by_id(loan_id)
-        if loan and loan.return_book():
-            return self.db.update_loan(loan_id, is_returned=1)
-        return False
+        return self.db.mark_loan_returned(loan_id) is not None
 
     def get_overdue_loans(self) -> list[Loan]:
         return self.db.get_overdue_loans()
@@ -1,5 +1,10 @@
+from database.database_manager import BULK_CHUNK_SIZE, PAGE_SIZE, SEARCH_LIMIT
 from models.reader import Reader
 
+# Largest SQLite integer; a longer run of digits cannot be a reader id
+MAX_ROWID = 2 ** 63 - 1
+
+
 class ReaderController:
     def __init__(self, db_manager) -> None:
         self.db = db_manager
@@ -8,12 +13,40 @@ class ReaderController:
         reader = Reader(name, email, phone)
         return self.db.add_reader(reader)
 
+    def add_readers_many(self, readers, chunk_size=BULK_CHUNK_SIZE) -> list[int]:
+        models = (Reader(**reader) for reader in readers)
+        return self.db.add_readers_many(models, chunk_size)
+
     def get_reader(self, reader_id) -> Reader | None:
         return self.db.get_reader_by_id(reader_id)
 
     def get_all_readers(self) -> list[Reader]:
         return self.db.get_all_readers()
 
+    def search_readers(self, query, limit=SEARCH_LIMIT, offset=0) -> list[Reader]:
+        return self.db.search_readers(query, limit, offset)
+
+    def find_readers(self, text, limit=SEARCH_LIMIT) -> list[Reader]:
+        # Checkout typeahead: the reader with that exact id first, then name,
+        # email and phone prefix matches; no text lists the first readers
+        text = text.strip()
+        if not text:
+            return self.db.list_readers(0, limit)
+        readers = self.db.search_readers(text, limit)
+        reader = self.db.get_reader_by_id(int(text)) if _is_rowid(text) else None
+        if reader is not None:
+            readers = [reader] + [r for r in readers if r.id != reader.id][:limit - 1]
+        return readers
+
+    def list_readers(self, after_id=0, limit=PAGE_SIZE, offset=0) -> list[Reader]:
+        return self.db.list_readers(after_id, limit, offset=offset)
+
+    def count_readers(self) -> int:
+        return self.db.count_readers()
+
+    def iter_readers(self, batch_size=PAGE_SIZE):
+        return self.db.iter_readers(batch_size)
+
     def update_reader(self, reader_id, **kwargs) -> bool:
         return self.db.update_reader(reader_id, **kwargs)
 
@@ -23,3 +56,8 @@ class ReaderController:
     def get_reader_loans(self, reader_id) -> list:
         return self.db.get_reader_loans(reader_id)
 
+
+def _is_rowid(text) -> bool:
+    # isdigit() alone accepts digits such as "²" or "٣" that int() rejects
+    # or reads differently
+    return text.isascii() and text.isdigit() and int(text) <= MAX_ROWID
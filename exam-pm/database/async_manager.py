@@ -0,0 +1,78 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter, itemgetter
+from database.database_manager import PAGE_SIZE
+from database.pool import PooledDatabaseManager
+
+ASYNC_WORKERS = 4
+
+# Context managers hold per-thread state and cannot span awaits; run a
+# function with run() instead
+_SYNC_ONLY = {"transaction", "savepoint", "capture_query_plans", "release", "close"}
+
+
+class AsyncDatabaseManager:
+    # Asyncio front for DatabaseManager: calls run on a fixed pool of worker
+    # threads, and each worker keeps its own connection of the pooled
+    # manager, so the event loop never waits on SQLite. Every public method
+    # of DatabaseManager is available as a coroutine
+    def __init__(self, db_path="library.db", max_workers=ASYNC_WORKERS) -> None:
+        self.db = PooledDatabaseManager(db_path)
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="db-worker")
+
+    async def call(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    async def run(self, fn, *args, **kwargs):
+        # fn(db, ...) runs on one worker thread from start to finish, so it
+        # may use db.transaction() for multi-statement units
+        return await self.call(fn, self.db, *args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name in _SYNC_ONLY:
+            raise AttributeError(name)
+        method = getattr(self.db, name)
+
+        async def call(*args, **kwargs):
+            return await self.call(method, *args, **kwargs)
+        return call
+
+    async def pages(self, list_page, batch_size=PAGE_SIZE, key=attrgetter("id")):
+        # Keyset pagination; only one page is in memory at a time and the
+        # loop is free between pages
+        after_id = 0
+        while True:
+            page = await self.call(list_page, after_id, batch_size)
+            for item in page:
+                yield item
+            if len(page) < batch_size:
+                return
+            after_id = key(page[-1])
+
+    def iter_books(self, batch_size=PAGE_SIZE):
+        return self.pages(self.db.list_books, batch_size)
+
+    def iter_readers(self, batch_size=PAGE_SIZE):
+        return self.pages(self.db.list_readers, batch_size)
+
+    def iter_loans(self, batch_size=PAGE_SIZE):
+        return self.pages(self.db.list_loans, batch_size)
+
+    def iter_loan_details(self, batch_size=PAGE_SIZE, **filters):
+        def list_page(after_id, limit):
+            return self.db.list_loan_details(after_id=after_id, limit=limit, **filters)
+        return self.pages(list_page, batch_size, key=itemgetter("id"))
+
+    async def close(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self.db.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -0,0 +1,231 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from database.database_manager import BULK_CHUNK_SIZE, SEARCH_LIMIT, DatabaseManager
+from database.pool import PooledDatabaseManager
+from models.book import Book
+from models.reader import Reader
+
+CACHE_SIZE = 1024
+# Bounds staleness from writers outside this manager (other processes)
+CACHE_TTL = 30.0
+# Budget of the search cache in cached rows across all result sets
+SEARCH_CACHE_ROWS = 20000
+
+_MISSING = object()
+
+
+class LRUCache:
+    # maxsize is measured in entry weights; every entry weighs 1 unless put()
+    # is given a weight. Safe to share between threads
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL, clock=time.monotonic) -> None:
+        if maxsize <= 0:
+            raise ValueError("Cache size must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value, weight)
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > self._clock()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self.pop(key)
+            self.misses += 1
+            return default
+
+    def put(self, key, value, weight=1) -> None:
+        if weight > self.maxsize:
+            return
+        with self._lock:
+            self.pop(key)
+            expires_at = None if self.ttl is None else self._clock() + self.ttl
+            self._entries[key] = (expires_at, value, weight)
+            self.weight += weight
+            while self.weight > self.maxsize:
+                self.weight -= self._entries.popitem(last=False)[1][2]
+                self.evictions += 1
+
+    def pop(self, key) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.weight -= entry[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "weight": self.weight,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class CachingDatabaseManager(DatabaseManager):
+    # Read-through cache for lookups by id. Callers get copies, so mutating a
+    # returned model never leaks into the cache; every write that can change
+    # a cached row drops its entry.
+    # Search results are keyed on the table's generation, which every write
+    # to the table bumps, so stale result sets are never looked up again and
+    # simply age out of the LRU.
+    # Other threads may write through the same manager (the pooled variant).
+    # Every write, or whole outermost transaction, counts as open from before
+    # its first statement until after its commit or rollback, and bumps all
+    # generations at both ends. A read only fills the cache if no write was
+    # open when it started and the generation had not moved by the time it
+    # finished, so uncommitted or just-committed changes never leave an old
+    # row or result set behind
+    def __init__(self, db_path="library.db", maxsize=CACHE_SIZE, ttl=CACHE_TTL,
+                 search_rows=SEARCH_CACHE_ROWS) -> None:
+        self.book_cache = LRUCache(maxsize, ttl)
+        self.reader_cache = LRUCache(maxsize, ttl)
+        self.search_cache = LRUCache(search_rows, ttl)
+        self.generations = {"books": 0, "readers": 0}
+        self._open_writes = 0
+        self._writes_lock = threading.Lock()
+        super().__init__(db_path)
+
+    def cache_stats(self) -> dict:
+        return {
+            "books": self.book_cache.stats(),
+            "readers": self.reader_cache.stats(),
+            "searches": self.search_cache.stats(),
+        }
+
+    def _bump(self, table) -> None:
+        with self._writes_lock:
+            self.generations[table] += 1
+
+    def _open_write(self, step) -> None:
+        with self._writes_lock:
+            self._open_writes += step
+            for table in self.generations:
+                self.generations[table] += 1
+
+    @contextmanager
+    def transaction(self):
+        if self._tx_depth:
+            with super().transaction():
+                yield self
+            return
+        self._open_write(1)
+        try:
+            with super().transaction():
+                yield self
+        finally:
+            self._open_write(-1)
+
+    def _write(self, table, cache, key, write, *args, **kwargs):
+        # Inside a transaction the write stays open until the commit
+        standalone = self._tx_depth == 0
+        if standalone:
+            self._open_write(1)
+        self._bump(table)
+        if cache is not None:
+            cache.pop(key)
+        try:
+            return write(*args, **kwargs)
+        finally:
+            if standalone:
+                self._open_write(-1)
+
+    def _read_generation(self, table):
+        # None when the result must not be cached: a write is open somewhere,
+        # or this thread is inside a transaction that may still roll back
+        with self._writes_lock:
+            if self._open_writes or self._tx_depth:
+                return None
+            return self.generations[table]
+
+    def _still_current(self, table, generation) -> bool:
+        with self._writes_lock:
+            return generation is not None and generation == self.generations[table]
+
+    def _cached(self, cache, table, key, load):
+        value = cache.get(key)
+        if value is not _MISSING:
+            return copy.copy(value)
+        generation = self._read_generation(table)
+        value = load(key)
+        if value is not None and self._still_current(table, generation):
+            cache.put(key, copy.copy(value))
+        return value
+
+    def get_book_by_id(self, book_id) -> Book | None:
+        return self._cached(self.book_cache, "books", book_id, super().get_book_by_id)
+
+    def search_books(self, query, limit=SEARCH_LIMIT, offset=0) -> list[Book]:
+        generation = self._read_generation("books")
+        # Normalised only as far as the lookup is: the exact ISBN match is
+        # case- and space-sensitive
+        key = (generation, query.strip(), limit, offset)
+        books = self.search_cache.get(key) if generation is not None else _MISSING
+        if books is not _MISSING:
+            return [copy.copy(book) for book in books]
+        books = super().search_books(query, limit, offset)
+        if self._still_current("books", generation):
+            self.search_cache.put(key, [copy.copy(book) for book in books], len(books) or 1)
+        return books
+
+    def add_book(self, book: Book) -> int:
+        return self._write("books", None, None, super().add_book, book)
+
+    def add_books_many(self, books, chunk_size=BULK_CHUNK_SIZE) -> list[int]:
+        return self._write("books", None, None, super().add_books_many, books, chunk_size)
+
+    def update_book(self, book_id, **kwargs) -> bool:
+        return self._write("books", self.book_cache, book_id,
+                           super().update_book, book_id, **kwargs)
+
+    def delete_book(self, book_id) -> bool:
+        return self._write("books", self.book_cache, book_id, super().delete_book, book_id)
+
+    def decrement_available(self, book_id) -> bool:
+        return self._write("books", self.book_cache, book_id, super().decrement_available, book_id)
+
+    def increment_available(self, book_id) -> bool:
+        return self._write("books", self.book_cache, book_id, super().increment_available, book_id)
+
+    def get_reader_by_id(self, reader_id) -> Reader | None:
+        return self._cached(self.reader_cache, "readers", reader_id, super().get_reader_by_id)
+
+    def add_reader(self, reader: Reader) -> int:
+        return self._write("readers", None, None, super().add_reader, reader)
+
+    def add_readers_many(self, readers, chunk_size=BULK_CHUNK_SIZE) -> list[int]:
+        return self._write("readers", None, None, super().add_readers_many, readers, chunk_size)
+
+    def update_reader(self, reader_id, **kwargs) -> bool:
+        return self._write("readers", self.reader_cache, reader_id,
+                           super().update_reader, reader_id, **kwargs)
+
+    def delete_reader(self, reader_id) -> bool:
+        return self._write("readers", self.reader_cache, reader_id,
+                           super().delete_reader, reader_id)
+
+
+class PooledCachingDatabaseManager(CachingDatabaseManager, PooledDatabaseManager):
+    # Cached lookups over per-thread connections, for callers that read on
+    # worker threads while the main thread writes (the GUI's loaders)
+    pass
@@ -1,237 +1,776 @@
+import re
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import islice
+from operator import attrgetter, itemgetter
+from database.dates import from_db_date, to_db_date
+from database.tables import BookTable, ReaderTable, LoanTable
 from models.book import Book
 from models.reader import Reader
 from models.loan import Loan
 
+BULK_CHUNK_SIZE = 1000
+PAGE_SIZE = 500
+SEARCH_LIMIT = 100
+SCHEMA_VERSION = 2
+MIGRATION_BATCH_SIZE = 10000
+
+TABLE_SCHEMAS = {
+    "books": """
+        CREATE TABLE {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            author TEXT NOT NULL,
+            isbn TEXT NOT NULL UNIQUE,
+            year INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            available INTEGER NOT NULL
+        )
+    """,
+    "readers": """
+        CREATE TABLE {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            phone TEXT NOT NULL,
+            registration_date INTEGER NOT NULL
+        )
+    """,
+    "loans": """
+        CREATE TABLE {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            book_id INTEGER NOT NULL,
+            reader_id INTEGER NOT NULL,
+            loan_date INTEGER NOT NULL,
+            return_date INTEGER NOT NULL,
+            is_returned INTEGER NOT NULL,
+            FOREIGN KEY (book_id) REFERENCES books(id),
+            FOREIGN KEY (reader_id) REFERENCES readers(id)
+        )
+    """,
+}
+
+# Columns that schema version 1 stored as "%Y-%m-%d %H:%M:%S" TEXT
+DATE_COLUMNS = {
+    "readers": ("registration_date",),
+    "loans": ("loan_date", "return_date"),
+}
+
+
+def _chunks(items, size):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Row factories: stored rows are trusted, so models are built without
+# re-running constructor validation
+def _book_row(cursor, row) -> Book:
+    return Book.from_row(row)
+
+
+def _reader_row(cursor, row) -> Reader:
+    return Reader.from_row((row[0], row[1], row[2], row[3], from_db_date(row[4])))
+
+
+def _loan_row(cursor, row) -> Loan:
+    return Loan.from_row((
+        row[0], row[1], row[2], from_db_date(row[3]), from_db_date(row[4]), bool(row[5])
+    ))
+
+
+def _loan_details_row(cursor, row) -> dict:
+    return {
+        "id": row[0],
+        "book_id": row[1],
+        "reader_id": row[2],
+        "loan_date": from_db_date(row[3]),
+        "return_date": from_db_date(row[4]),
+        "is_returned": bool(row[5]),
+        "book_title": row[6],
+        "book_isbn": row[7],
+        "reader_name": row[8],
+        "reader_email": row[9]
+    }
+
+
+def _fts_query(text) -> str:
+    # Every word becomes a quoted prefix term, so user input can never be
+    # parsed as FTS5 query syntax; terms are ANDed
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text))
+
+
+def _looks_like_phone(text) -> bool:
+    return re.fullmatch(r"[+\d][\d\s()-]*", text) is not None
+
+
+def _loan_status_clause(status, as_of):
+    if status == "active":
+        return "loans.is_returned = 0", []
+    if status == "returned":
+        return "loans.is_returned = 1", []
+    if status == "overdue":
+        return "loans.is_returned = 0 AND loans.return_date < ?", [to_db_date(as_of)]
+    raise ValueError(f"Unknown loan status: {status}")
+
+
+_LOAN_DETAILS_SELECT = """
+    SELECT loans.*, books.title, books.isbn, readers.name, readers.email
+    FROM loans
+    LEFT JOIN books ON books.id = loans.book_id
+    LEFT JOIN readers ON readers.id = loans.reader_id
+"""
+
+
+def _loan_filters(status, reader_id, book_id, due_before, after_id):
+    # Builds the WHERE clause shared by the filtered loan listings; "as of"
+    # for the overdue status is taken once per query
+    clauses, params = ["loans.id > ?"], [after_id]
+    if status is not None:
+        clause, values = _loan_status_clause(status, datetime.now())
+        clauses.append(clause)
+        params.extend(values)
+    for column, value in (("reader_id", reader_id), ("book_id", book_id)):
+        if value is not None:
+            clauses.append(f"loans.{column} = ?")
+            params.append(value)
+    if due_before is not None:
+        clauses.append("loans.return_date < ?")
+        params.append(to_db_date(due_before))
+    return " AND ".join(clauses), params
+
+
+def _iter_pages(list_page, batch_size, key=attrgetter("id")):
+    # Keyset pagination: every page is an indexed range scan on the primary key
+    after_id = 0
+    while True:
+        page = list_page(after_id, batch_size)
+        yield from page
+        if len(page) < batch_size:
+            return
+        after_id = key(page[-1])
+
+
+def _iter_table_pages(list_page, batch_size):
+    # Same as _iter_pages, but yields each columnar page as a whole
+    after_id = 0
+    while True:
+        table = list_page(after_id, batch_size)
+        if table:
+            yield table
+        if len(table) < batch_size:
+            return
+        after_id = table.ids[-1]
+
+
 class DatabaseManager:
+    _begin_sql = "BEGIN"
+
     def __init__(self, db_path="library.db") -> None:
-        self.conn = sqlite3.connect(db_path)
+        self.db_path = db_path
+        self.conn = self._connect()
         self.cursor = self.conn.cursor()
+        self._tx_depth = 0
         self.create_tables()
 
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
     def close(self) -> None:
         self.conn.close()
 
+    def _commit(self) -> None:
+        # Inside transaction() the outermost scope commits once on exit
+        if not self._tx_depth:
+            self.conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        if self._tx_depth:
+            with self.savepoint():
+                yield self
+            return
+        self.conn.execute(self._begin_sql)
+        self._tx_depth = 1
+        try:
+            yield self
+        except BaseException:
+            self.conn.rollback()
+            raise
+        else:
+            self.conn.commit()
+        finally:
+            self._tx_depth = 0
+
+    @contextmanager
+    def savepoint(self):
+        if not self._tx_depth:
+            with self.transaction():
+                yield self
+            return
+        name = f"sp_{self._tx_depth}"
+        self.conn.execute(f"SAVEPOINT {name}")
+        self._tx_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.conn.execute(f"ROLLBACK TO {name}")
+            raise
+        finally:
+            self._tx_depth -= 1
+            self.conn.execute(f"RELEASE {name}")
+
     def create_tables(self) -> None:
+        for table, schema in TABLE_SCHEMAS.items():
+            self.cursor.execute(schema.format(name=f"IF NOT EXISTS {table}"))
+        self._migrate_schema()
+
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_loans_reader_id ON loans (reader_id)"
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_loans_book_id ON loans (book_id)"
+        )
+        # Status filters (is_returned) in id order, for keyset pages and counts
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_loans_is_returned ON loans (is_returned, id)"
+        )
+        # Partial index: only open loans are ever searched by due date
         self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS books (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                author TEXT NOT NULL,
-                isbn TEXT NOT NULL UNIQUE,
-                year INTEGER NOT NULL,
-                quantity INTEGER NOT NULL,
-                available INTEGER NOT NULL
-            )
+            CREATE INDEX IF NOT EXISTS idx_loans_open_return_date
+            ON loans (return_date) WHERE is_returned = 0
         """)
-        
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_readers_phone ON readers (phone)"
+        )
+        # Partial index: the checkout picker lists only books with copies left
         self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS readers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT NOT NULL UNIQUE,
-                phone TEXT NOT NULL,
-                registration_date TEXT NOT NULL
+            CREATE INDEX IF NOT EXISTS idx_books_available
+            ON books (id) WHERE available > 0
+        """)
+        self._create_search_index("books", ("title", "author"))
+        self._create_search_index("readers", ("name", "email", "phone"))
+        self._commit()
+
+    def _migrate_schema(self) -> None:
+        self.cursor.execute("PRAGMA user_version")
+        if self.cursor.fetchone()[0] >= SCHEMA_VERSION:
+            return
+        for table, date_columns in DATE_COLUMNS.items():
+            self.cursor.execute(f"PRAGMA table_info({table})")
+            types = {row[1]: row[2].upper() for row in self.cursor.fetchall()}
+            if types[date_columns[0]] != "INTEGER":
+                self._migrate_dates_to_epoch(table, date_columns)
+        self.cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _migrate_dates_to_epoch(self, table, date_columns) -> None:
+        # Online copy into a new table: triggers mirror every write made to
+        # the old table while rows are copied in batches, each batch in its
+        # own transaction, then the tables are swapped. An interrupted
+        # migration resumes on the next start.
+        new_table = f"{table}_v{SCHEMA_VERSION}"
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        columns = [row[1] for row in self.cursor.fetchall()]
+        names = ", ".join(columns)
+
+        def converted(prefix):
+            return ", ".join(
+                f"CAST(strftime('%s', {prefix}{column}) AS INTEGER)"
+                if column in date_columns else f"{prefix}{column}"
+                for column in columns
             )
+
+        with self.transaction():
+            self.cursor.execute(TABLE_SCHEMAS[table].format(name=f"IF NOT EXISTS {new_table}"))
+            for event in ("INSERT", "UPDATE"):
+                self.cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {new_table}_mirror_{event.lower()}
+                    AFTER {event} ON {table} BEGIN
+                        INSERT OR REPLACE INTO {new_table} ({names})
+                        VALUES ({converted("new.")});
+                    END
+                """)
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {new_table}_mirror_delete
+                AFTER DELETE ON {table} BEGIN
+                    DELETE FROM {new_table} WHERE id = old.id;
+                END
+            """)
+        # Rows already mirrored by a trigger are newer than the old copy
+        self._copy_in_batches(table, f"""
+            INSERT INTO {new_table} ({names})
+            SELECT {converted("")} FROM {table}
+            WHERE id > ? AND id <= ?
+            AND NOT EXISTS (SELECT 1 FROM {new_table} WHERE id = {table}.id)
         """)
-        
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS loans (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                book_id INTEGER NOT NULL,
-                reader_id INTEGER NOT NULL,
-                loan_date TEXT NOT NULL,
-                return_date TEXT NOT NULL,
-                is_returned INTEGER NOT NULL,
-                FOREIGN KEY (book_id) REFERENCES books(id),
-                FOREIGN KEY (reader_id) REFERENCES readers(id)
+        self._replace_table(table, new_table)
+
+    def _copy_in_batches(self, table, copy_sql) -> None:
+        after_id = 0
+        while after_id is not None:
+            with self.transaction():
+                self.cursor.execute(f"""
+                    SELECT MAX(id) FROM (
+                        SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT ?
+                    )
+                """, (after_id, MIGRATION_BATCH_SIZE))
+                last_id = self.cursor.fetchone()[0]
+                self.cursor.execute(copy_sql, (after_id, last_id))
+            after_id = last_id
+
+    def _replace_table(self, table, new_table) -> None:
+        # Dropping the old table also drops its indexes and triggers;
+        # create_tables recreates them for the new one
+        with self.transaction():
+            self.cursor.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name IN (?, ?)",
+                (table, new_table)
+            )
+            seq = self.cursor.fetchone()[0]
+            self.cursor.execute(f"DROP TABLE {table}")
+            self.cursor.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+            # Keep AUTOINCREMENT from reusing ids of deleted trailing rows
+            self.cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+            self.cursor.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, seq)
+            )
+
+    def _create_search_index(self, table, columns) -> None:
+        # External-content FTS5 index over the given text columns, kept in
+        # sync by triggers; updates of other columns do not touch it
+        fts = f"{table}_fts"
+        names = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+        )
+        exists = self.cursor.fetchone() is not None
+        self.cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {names}, content='{table}', content_rowid='id'
             )
         """)
-        self.conn.commit()
+        self.cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts} (rowid, {names}) VALUES (new.id, {new_values});
+            END
+        """)
+        self.cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {names})
+                VALUES ('delete', old.id, {old_values});
+            END
+        """)
+        self.cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_update
+            AFTER UPDATE OF {names} ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {names})
+                VALUES ('delete', old.id, {old_values});
+                INSERT INTO {fts} (rowid, {names}) VALUES (new.id, {new_values});
+            END
+        """)
+        if not exists:
+            # Index rows written before the search index existed
+            self.cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+    def _query(self, row_factory, sql, params=()) -> sqlite3.Cursor:
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory
+        return cursor.execute(sql, params)
+
+    def _fetch_all(self, row_factory, table_type, columnar, sql, params=()):
+        # columnar=True streams raw rows into a compact table instead of a list
+        if columnar:
+            return table_type.from_rows(self._query(None, sql, params))
+        return self._query(row_factory, sql, params).fetchall()
+
+    def explain_query_plan(self, sql, params=()) -> list[str]:
+        rows = self.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return [row[3] for row in rows]
+
+    @contextmanager
+    def capture_query_plans(self):
+        # Collects the plan of every SELECT run inside the block; the dict is
+        # filled when the block exits
+        statements = []
+        plans = {}
+        self.conn.set_trace_callback(statements.append)
+        try:
+            yield plans
+        finally:
+            self.conn.set_trace_callback(None)
+        for sql in statements:
+            if sql.lstrip().upper().startswith("SELECT"):
+                plans[sql] = self.explain_query_plan(sql)
+
+    def _insert_many(self, sql, items, values, chunk_size) -> list[int]:
+        # Each chunk is written with one executemany in its own transaction
+        # (a savepoint when called inside transaction()). Rowids handed out
+        # inside a single write transaction are consecutive, so the chunk's
+        # ids are recovered from the last inserted rowid.
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive")
+        ids = []
+        for chunk in _chunks(items, chunk_size):
+            with self.transaction():
+                self.cursor.executemany(sql, [values(item) for item in chunk])
+                last_id = self.cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            first_id = last_id - len(chunk) + 1
+            for offset, item in enumerate(chunk):
+                item.id = first_id + offset
+            ids.extend(range(first_id, last_id + 1))
+        return ids
+
+    @staticmethod
+    def _book_values(book: Book) -> tuple:
+        return (book.title, book.author, book.isbn, book.year, book.quantity, book.available)
 
     def add_book(self, book: Book) -> int:
         self.cursor.execute("""
             INSERT INTO books (title, author, isbn, year, quantity, available)
             VALUES (?, ?, ?, ?, ?, ?)
-        """, (book.title, book.author, book.isbn, book.year, book.quantity, book.available))
-        self.conn.commit()
+        """, self._book_values(book))
+        self._commit()
         book.id = self.cursor.lastrowid
         return book.id
 
+    def add_books_many(self, books, chunk_size=BULK_CHUNK_SIZE) -> list[int]:
+        return self._insert_many("""
+            INSERT INTO books (title, author, isbn, year, quantity, available)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, books, self._book_values, chunk_size)
+
     def get_book_by_id(self, book_id) -> Book | None:
-        self.cursor.execute("SELECT * FROM books WHERE id = ?", (book_id,))
-        row = self.cursor.fetchone()
-        if row:
-            book = Book(row[1], row[2], row[3], row[4], row[5])
-            book.id = row[0]
-            book.available = row[6]
-            return book
-        return None
-
-    def get_all_books(self) -> list[Book]:
-        self.cursor.execute("SELECT * FROM books")
-        books = []
-        for row in self.cursor.fetchall():
-            book = Book(row[1], row[2], row[3], row[4], row[5])
-            book.id = row[0]
-            book.available = row[6]
-            books.append(book)
-        return books
+        return self._query(_book_row, "SELECT * FROM books WHERE id = ?", (book_id,)).fetchone()
+
+    def get_all_books(self, columnar=False) -> list[Book] | BookTable:
+        return self._fetch_all(_book_row, BookTable, columnar, "SELECT * FROM books")
+
+    def list_books(self, after_id=0, limit=PAGE_SIZE, columnar=False,
+                   offset=0) -> list[Book] | BookTable:
+        # offset skips rows after after_id; keep it small and page by after_id
+        return self._fetch_all(
+            _book_row, BookTable, columnar,
+            "SELECT * FROM books WHERE id > ? ORDER BY id LIMIT ? OFFSET ?",
+            (after_id, limit, offset)
+        )
+
+    def count_books(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    def iter_books(self, batch_size=PAGE_SIZE, columnar=False):
+        # columnar=True yields one BookTable per page
+        if columnar:
+            return _iter_table_pages(
+                lambda after_id, limit: self.list_books(after_id, limit, columnar=True),
+                batch_size
+            )
+        return _iter_pages(self.list_books, batch_size)
 
     def update_book(self, book_id, **kwargs) -> bool:
         set_clause = ", ".join(f"{k} = ?" for k in kwargs)
         values = list(kwargs.values())
         values.append(book_id)
         self.cursor.execute(f"UPDATE books SET {set_clause} WHERE id = ?", values)
-        self.conn.commit()
+        self._commit()
         return self.cursor.rowcount > 0
 
     def delete_book(self, book_id) -> bool:
         self.cursor.execute("DELETE FROM books WHERE id = ?", (book_id,))
-        self.conn.commit()
+        self._commit()
         return self.cursor.rowcount > 0
 
-    def search_books(self, query) -> list[Book]:
-        query = f"%{query}%"
+    def decrement_available(self, book_id) -> bool:
+        # Single conditional write: the check and the update cannot interleave
+        # with another desk borrowing the last copy
         self.cursor.execute("""
-            SELECT * FROM books 
-            WHERE title LIKE ? OR author LIKE ? OR isbn LIKE ?
-        """, (query, query, query))
-        books = []
-        for row in self.cursor.fetchall():
-            book = Book(row[1], row[2], row[3], row[4], row[5])
-            book.id = row[0]
-            book.available = row[6]
-            books.append(book)
+            UPDATE books SET available = available - 1
+            WHERE id = ? AND available > 0
+        """, (book_id,))
+        self._commit()
+        return self.cursor.rowcount > 0
+
+    def increment_available(self, book_id) -> bool:
+        self.cursor.execute("""
+            UPDATE books SET available = available + 1
+            WHERE id = ? AND available < quantity
+        """, (book_id,))
+        self._commit()
+        return self.cursor.rowcount > 0
+
+    def get_book_by_isbn(self, isbn) -> Book | None:
+        return self._query(
+            _book_row, "SELECT * FROM books WHERE isbn = ?", (isbn.strip(),)
+        ).fetchone()
+
+    def search_books(self, query, limit=SEARCH_LIMIT, offset=0) -> list[Book]:
+        # An exact ISBN is answered by the unique index, everything else by
+        # BM25-ranked prefix search over title and author (title weighs more)
+        book = self.get_book_by_isbn(query)
+        if book is not None:
+            return [book] if offset == 0 else []
+        match = _fts_query(query)
+        if not match:
+            return []
+        return self._query(_book_row, """
+            SELECT books.* FROM books_fts
+            JOIN books ON books.id = books_fts.rowid
+            WHERE books_fts MATCH ?
+            ORDER BY bm25(books_fts, 2.0, 1.0)
+            LIMIT ? OFFSET ?
+        """, (match, limit, offset)).fetchall()
+
+    def search_available_books(self, prefix, limit=SEARCH_LIMIT) -> list[Book]:
+        # Checkout typeahead: available books whose ISBN starts with the text
+        # (a range on the unique index), then those with title words starting
+        # with it; no text lists the first available books
+        prefix = prefix.strip()
+        if not prefix:
+            return self._query(_book_row, """
+                SELECT * FROM books WHERE available > 0 ORDER BY id LIMIT ?
+            """, (limit,)).fetchall()
+        books = self._query(_book_row, """
+            SELECT * FROM books
+            WHERE isbn >= ? AND isbn < ? AND available > 0
+            ORDER BY isbn
+            LIMIT ?
+        """, (prefix, prefix + "\uffff", limit)).fetchall()
+        match = _fts_query(prefix)
+        if match and len(books) < limit:
+            seen = {book.id for book in books}
+            books += [
+                book for book in self._available_by_title(match, limit) if book.id not in seen
+            ][:limit - len(books)]
         return books
 
+    def _available_by_title(self, match, limit) -> list[Book]:
+        return self._query(_book_row, """
+            SELECT books.* FROM books_fts
+            JOIN books ON books.id = books_fts.rowid
+            WHERE books_fts MATCH ? AND books.available > 0
+            ORDER BY bm25(books_fts)
+            LIMIT ?
+        """, (f"title : ({match})", limit)).fetchall()
+
+    @staticmethod
+    def _reader_values(reader: Reader) -> tuple:
+        return (
+            reader.name,
+            reader.email,
+            reader.phone,
+            to_db_date(reader.registration_date)
+        )
+
     def add_reader(self, reader: Reader) -> int:
         self.cursor.execute("""
             INSERT INTO readers (name, email, phone, registration_date)
             VALUES (?, ?, ?, ?)
-        """, (reader.name, reader.email, reader.phone, reader.registration_date.strftime("%Y-%m-%d %H:%M:%S")))
-        self.conn.commit()
+        """, self._reader_values(reader))
+        self._commit()
         reader.id = self.cursor.lastrowid
         return reader.id
 
+    def add_readers_many(self, readers, chunk_size=BULK_CHUNK_SIZE) -> list[int]:
+        return self._insert_many("""
+            INSERT INTO readers (name, email, phone, registration_date)
+            VALUES (?, ?, ?, ?)
+        """, readers, self._reader_values, chunk_size)
+
     def get_reader_by_id(self, reader_id) -> Reader | None:
-        self.cursor.execute("SELECT * FROM readers WHERE id = ?", (reader_id,))
-        row = self.cursor.fetchone()
-        if row:
-            reader = Reader(row[1], row[2], row[3])
-            reader.id = row[0]
-            reader.registration_date = datetime.strptime(row[4], "%Y-%m-%d %H:%M:%S")
-            return reader
-        return None
-
-    def get_all_readers(self) -> list[Reader]:
-        self.cursor.execute("SELECT * FROM readers")
-        readers = []
-        for row in self.cursor.fetchall():
-            reader = Reader(row[1], row[2], row[3])
-            reader.id = row[0]
-            reader.registration_date = datetime.strptime(row[4], "%Y-%m-%d %H:%M:%S")
-            readers.append(reader)
-        return readers
+        return self._query(
+            _reader_row, "SELECT * FROM readers WHERE id = ?", (reader_id,)
+        ).fetchone()
+
+    def get_all_readers(self, columnar=False) -> list[Reader] | ReaderTable:
+        return self._fetch_all(_reader_row, ReaderTable, columnar, "SELECT * FROM readers")
+
+    def get_reader_by_email(self, email) -> Reader | None:
+        return self._query(
+            _reader_row, "SELECT * FROM readers WHERE email = ?", (email.strip(),)
+        ).fetchone()
+
+    def get_readers_by_phone(self, phone) -> list[Reader]:
+        return self._query(
+            _reader_row, "SELECT * FROM readers WHERE phone = ? ORDER BY id", (phone.strip(),)
+        ).fetchall()
+
+    def _find_readers_exact(self, query) -> list[Reader]:
+        if "@" in query:
+            reader = self.get_reader_by_email(query)
+            return [reader] if reader else []
+        if _looks_like_phone(query.strip()):
+            return self.get_readers_by_phone(query)
+        return []
+
+    def search_readers(self, query, limit=SEARCH_LIMIT, offset=0) -> list[Reader]:
+        # Exact email/phone values hit their indexes, anything else goes
+        # through the FTS5 index over name, email and phone
+        readers = self._find_readers_exact(query)
+        if readers:
+            return readers[offset:offset + limit]
+        match = _fts_query(query)
+        if not match:
+            return []
+        return self._query(_reader_row, """
+            SELECT readers.* FROM readers_fts
+            JOIN readers ON readers.id = readers_fts.rowid
+            WHERE readers_fts MATCH ?
+            ORDER BY bm25(readers_fts)
+            LIMIT ? OFFSET ?
+        """, (match, limit, offset)).fetchall()
+
+    def list_readers(self, after_id=0, limit=PAGE_SIZE, columnar=False,
+                     offset=0) -> list[Reader] | ReaderTable:
+        # offset skips rows after after_id; keep it small and page by after_id
+        return self._fetch_all(
+            _reader_row, ReaderTable, columnar,
+            "SELECT * FROM readers WHERE id > ? ORDER BY id LIMIT ? OFFSET ?",
+            (after_id, limit, offset)
+        )
+
+    def count_readers(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM readers").fetchone()[0]
+
+    def iter_readers(self, batch_size=PAGE_SIZE, columnar=False):
+        # columnar=True yields one ReaderTable per page
+        if columnar:
+            return _iter_table_pages(
+                lambda after_id, limit: self.list_readers(after_id, limit, columnar=True),
+                batch_size
+            )
+        return _iter_pages(self.list_readers, batch_size)
 
     def update_reader(self, reader_id, **kwargs) -> bool:
         set_clause = ", ".join(f"{k} = ?" for k in kwargs)
         values = list(kwargs.values())
         values.append(reader_id)
         self.cursor.execute(f"UPDATE readers SET {set_clause} WHERE id = ?", values)
-        self.conn.commit()
+        self._commit()
         return self.cursor.rowcount > 0
 
     def delete_reader(self, reader_id) -> bool:
         self.cursor.execute("DELETE FROM readers WHERE id = ?", (reader_id,))
-        self.conn.commit()
+        self._commit()
         return self.cursor.rowcount > 0
 
 
+    @staticmethod
+    def _loan_values(loan: Loan) -> tuple:
+        return (
+            loan.book_id,
+            loan.reader_id,
+            to_db_date(loan.loan_date),
+            to_db_date(loan.return_date),
+            int(loan.is_returned)
+        )
+
     def add_loan(self, loan: Loan) -> int:
         self.cursor.execute("""
             INSERT INTO loans (book_id, reader_id, loan_date, return_date, is_returned)
             VALUES (?, ?, ?, ?, ?)
-        """, (
-            loan.book_id, 
-            loan.reader_id, 
-            loan.loan_date.strftime("%Y-%m-%d %H:%M:%S"), 
-            loan.return_date.strftime("%Y-%m-%d %H:%M:%S"),
-            int(loan.is_returned)
-        ))
-        self.conn.commit()
+        """, self._loan_values(loan))
+        self._commit()
         loan.id = self.cursor.lastrowid
         return loan.id
 
+    def add_loans_many(self, loans, chunk_size=BULK_CHUNK_SIZE) -> list[int]:
+        return self._insert_many("""
+            INSERT INTO loans (book_id, reader_id, loan_date, return_date, is_returned)
+            VALUES (?, ?, ?, ?, ?)
+        """, loans, self._loan_values, chunk_size)
+
     def get_loan_by_id(self, loan_id) -> Loan | None:
-        self.cursor.execute("SELECT * FROM loans WHERE id = ?", (loan_id,))
-        row = self.cursor.fetchone()
-        if row:
-            loan = Loan(
-                row[1], 
-                row[2], 
-                datetime.strptime(row[3], "%Y-%m-%d %H:%M:%S"),
-                datetime.strptime(row[4], "%Y-%m-%d %H:%M:%S")
-            )
-            loan.id = row[0]
-            loan.is_returned = bool(row[5])
-            return loan
-        return None
-
-    def get_all_loans(self) -> list[Loan]:
-        self.cursor.execute("SELECT * FROM loans")
-        loans = []
-        for row in self.cursor.fetchall():
-            loan = Loan(
-                row[1], 
-                row[2], 
-                datetime.strptime(row[3], "%Y-%m-%d %H:%M:%S"),
-                datetime.strptime(row[4], "%Y-%m-%d %H:%M:%S")
+        return self._query(_loan_row, "SELECT * FROM loans WHERE id = ?", (loan_id,)).fetchone()
+
+    def get_all_loans(self, columnar=False) -> list[Loan] | LoanTable:
+        return self._fetch_all(_loan_row, LoanTable, columnar, "SELECT * FROM loans")
+
+    def list_loans(self, after_id=0, limit=PAGE_SIZE, columnar=False,
+                   offset=0) -> list[Loan] | LoanTable:
+        # offset skips rows after after_id; keep it small and page by after_id
+        return self._fetch_all(
+            _loan_row, LoanTable, columnar,
+            "SELECT * FROM loans WHERE id > ? ORDER BY id LIMIT ? OFFSET ?",
+            (after_id, limit, offset)
+        )
+
+    def iter_loans(self, batch_size=PAGE_SIZE, columnar=False):
+        # columnar=True yields one LoanTable per page
+        if columnar:
+            return _iter_table_pages(
+                lambda after_id, limit: self.list_loans(after_id, limit, columnar=True),
+                batch_size
             )
-            loan.id = row[0]
-            loan.is_returned = bool(row[5])
-            loans.append(loan)
-        return loans
+        return _iter_pages(self.list_loans, batch_size)
 
     def update_loan(self, loan_id, **kwargs) -> bool:
         set_clause = ", ".join(f"{k} = ?" for k in kwargs)
         values = list(kwargs.values())
         values.append(loan_id)
         self.cursor.execute(f"UPDATE loans SET {set_clause} WHERE id = ?", values)
-        self.conn.commit()
+        self._commit()
         return self.cursor.rowcount > 0
 
+    def mark_loan_returned(self, loan_id) -> int | None:
+        # Returns the loan's book_id, or None if it is unknown or already returned
+        self.cursor.execute("""
+            UPDATE loans SET is_returned = 1
+            WHERE id = ? AND is_returned = 0
+            RETURNING book_id
+        """, (loan_id,))
+        row = self.cursor.fetchone()
+        self._commit()
+        return row[0] if row else None
+
     def get_reader_loans(self, reader_id) -> list[Loan]:
-        self.cursor.execute("SELECT * FROM loans WHERE reader_id = ?", (reader_id,))
-        loans = []
-        for row in self.cursor.fetchall():
-            loan = Loan(
-                row[1], 
-                row[2], 
-                datetime.strptime(row[3], "%Y-%m-%d %H:%M:%S"),
-                datetime.strptime(row[4], "%Y-%m-%d %H:%M:%S")
-            )
-            loan.id = row[0]
-            loan.is_returned = bool(row[5])
-            loans.append(loan)
-        return loans
+        return self._query(
+            _loan_row, "SELECT * FROM loans WHERE reader_id = ?", (reader_id,)
+        ).fetchall()
 
     def get_overdue_loans(self) -> list[Loan]:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.cursor.execute("""
+        now = to_db_date(datetime.now())
+        return self._query(_loan_row, """
             SELECT * FROM loans 
             WHERE return_date < ? AND is_returned = 0
-        """, (now,))
-        loans = []
-        for row in self.cursor.fetchall():
-            loan = Loan(
-                row[1], 
-                row[2], 
-                datetime.strptime(row[3], "%Y-%m-%d %H:%M:%S"),
-                datetime.strptime(row[4], "%Y-%m-%d %H:%M:%S")
-            )
-            loan.id = row[0]
-            loan.is_returned = bool(row[5])
-            loans.append(loan)
-        return loans
\ No newline at end of file
+        """, (now,)).fetchall()
+
+    def get_loans(self, status=None, reader_id=None, book_id=None, due_before=None,
+                  limit=PAGE_SIZE, after_id=0) -> list[Loan]:
+        # limit=None returns every matching loan (SQLite treats LIMIT -1 as none)
+        where, params = _loan_filters(status, reader_id, book_id, due_before, after_id)
+        params.append(-1 if limit is None else limit)
+        return self._query(
+            _loan_row, f"SELECT * FROM loans WHERE {where} ORDER BY loans.id LIMIT ?", params
+        ).fetchall()
+
+    def list_loan_details(self, status=None, reader_id=None, book_id=None, due_before=None,
+                          limit=PAGE_SIZE, after_id=0, offset=0) -> list[dict]:
+        # Loans with book title/ISBN and reader name/email in one query; LEFT
+        # JOIN keeps loans whose book or reader has since been deleted
+        where, params = _loan_filters(status, reader_id, book_id, due_before, after_id)
+        params.extend((-1 if limit is None else limit, offset))
+        return self._query(_loan_details_row, f"""
+            {_LOAN_DETAILS_SELECT}
+            WHERE {where}
+            ORDER BY loans.id
+            LIMIT ? OFFSET ?
+        """, params).fetchall()
+
+    def get_loan_details(self, loan_id) -> dict | None:
+        return self._query(
+            _loan_details_row, f"{_LOAN_DETAILS_SELECT} WHERE loans.id = ?", (loan_id,)
+        ).fetchone()
+
+    def count_loans(self, status=None, reader_id=None, book_id=None, due_before=None) -> int:
+        where, params = _loan_filters(status, reader_id, book_id, due_before, 0)
+        return self.conn.execute(f"SELECT COUNT(*) FROM loans WHERE {where}", params).fetchone()[0]
+
+    def iter_loan_details(self, batch_size=PAGE_SIZE, **filters):
+        def list_page(after_id, limit):
+            return self.list_loan_details(after_id=after_id, limit=limit, **filters)
+        return _iter_pages(list_page, batch_size, key=itemgetter("id"))
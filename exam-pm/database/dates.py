@@ -0,0 +1,15 @@
+# Dates are stored as integer seconds since 1970-01-01 of the naive
+# (wall-clock) datetime, the same convention as SQLite's strftime('%s', ...)
+
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def to_db_date(value) -> int:
+    return (value - EPOCH) // _SECOND
+
+
+def from_db_date(value) -> datetime:
+    return EPOCH + timedelta(seconds=value)
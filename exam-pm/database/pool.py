@@ -0,0 +1,141 @@
+import sqlite3
+import threading
+import time
+from database.database_manager import DatabaseManager
+
+# Seconds a statement waits on SQLite's busy handler for a lock
+BUSY_TIMEOUT = 5.0
+BUSY_RETRIES = 5
+RETRY_DELAY = 0.05
+
+
+def _is_busy(error) -> bool:
+    message = str(error)
+    return "locked" in message or "busy" in message
+
+
+class _RetryingCursor(sqlite3.Cursor):
+    # A statement that runs in its own (autocommit) transaction is retried with
+    # backoff once the busy timeout runs out. Inside an explicit transaction
+    # only the caller can safely retry the whole unit, so errors propagate
+    def execute(self, sql, parameters=()):
+        return self._retry(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not isinstance(seq_of_parameters, (list, tuple)):
+            # A consumed iterator cannot be replayed
+            return super().executemany(sql, seq_of_parameters)
+        return self._retry(super().executemany, sql, seq_of_parameters)
+
+    def _retry(self, run, sql, parameters):
+        connection = self.connection
+        attempt = 0
+        while True:
+            in_transaction = connection.in_transaction
+            try:
+                return run(sql, parameters)
+            except sqlite3.OperationalError as error:
+                if in_transaction or not _is_busy(error) or attempt >= connection.retries:
+                    raise
+            if connection.in_transaction:
+                connection.rollback()
+            time.sleep(connection.retry_delay * 2 ** attempt)
+            attempt += 1
+
+
+class _RetryingConnection(sqlite3.Connection):
+    retries = BUSY_RETRIES
+    retry_delay = RETRY_DELAY
+
+    def cursor(self, factory=_RetryingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+
+class PooledDatabaseManager(DatabaseManager):
+    # Same API as DatabaseManager, but every thread gets its own connection,
+    # cursor and transaction depth on one WAL database: readers never block
+    # behind the writer, and writers wait on the busy timeout. Transactions
+    # take the write lock up front (BEGIN IMMEDIATE), so two of them cannot
+    # deadlock upgrading from a read lock
+    _begin_sql = "BEGIN IMMEDIATE"
+
+    def __init__(self, db_path="library.db", timeout=BUSY_TIMEOUT, retries=BUSY_RETRIES,
+                 retry_delay=RETRY_DELAY) -> None:
+        if db_path == ":memory:":
+            raise ValueError("A pooled database needs a file path")
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+        super().__init__(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread=False only so that close() can close every
+        # thread's connection; each one is still used by its own thread
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout,
+                               factory=_RetryingConnection, check_same_thread=False)
+        conn.retries = self.retries
+        conn.retry_delay = self.retry_delay
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.conn = self._connect()
+        return conn
+
+    @conn.setter
+    def conn(self, conn) -> None:
+        self._local.conn = conn
+        self._local.cursor = conn.cursor()
+        self._local.tx_depth = 0
+        with self._lock:
+            self._connections.add(conn)
+
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        self.conn  # opens this thread's connection on first use
+        return self._local.cursor
+
+    @cursor.setter
+    def cursor(self, cursor) -> None:
+        self._local.cursor = cursor
+
+    @property
+    def _tx_depth(self) -> int:
+        return getattr(self._local, "tx_depth", 0)
+
+    @_tx_depth.setter
+    def _tx_depth(self, depth) -> None:
+        self._local.tx_depth = depth
+
+    def connection_count(self) -> int:
+        with self._lock:
+            return len(self._connections)
+
+    def release(self) -> None:
+        # Closes the calling thread's connection; worker threads call this
+        # before they exit
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        with self._lock:
+            self._connections.discard(conn)
+        del self._local.conn, self._local.cursor
+        self._local.tx_depth = 0
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
@@ -0,0 +1,149 @@
+# Columnar result sets for large reads: numeric columns live in typed arrays,
+# repeated strings are interned, and model objects are only built when a row
+# is accessed
+
+import sys
+from array import array
+from database.dates import from_db_date, to_db_date
+from models.book import Book
+from models.reader import Reader
+from models.loan import Loan
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_DAY = 86400
+
+
+def _text(value):
+    return None if value is None else sys.intern(value)
+
+
+class _Table:
+    __slots__ = ()
+
+    @classmethod
+    def from_rows(cls, rows):
+        # rows are raw tuples in table column order, e.g. an sqlite3 cursor
+        table = cls()
+        for row in rows:
+            table.append(row)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self._model.from_row(self.row(index))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+class BookTable(_Table):
+    __slots__ = ("ids", "titles", "authors", "isbns", "years", "quantities", "available")
+    _model = Book
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.titles = []
+        self.authors = []
+        self.isbns = []
+        self.years = array("i")
+        self.quantities = array("i")
+        self.available = array("i")
+
+    def append(self, row) -> None:
+        book_id, title, author, isbn, year, quantity, available = row
+        self.ids.append(book_id)
+        self.titles.append(_text(title))
+        self.authors.append(_text(author))
+        self.isbns.append(isbn)
+        self.years.append(year)
+        self.quantities.append(quantity)
+        self.available.append(available)
+
+    def row(self, index) -> tuple:
+        return (self.ids[index], self.titles[index], self.authors[index], self.isbns[index],
+                self.years[index], self.quantities[index], self.available[index])
+
+
+class ReaderTable(_Table):
+    __slots__ = ("ids", "names", "emails", "phones", "registration_dates")
+    _model = Reader
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.names = []
+        self.emails = []
+        self.phones = []
+        # Epoch seconds, as stored
+        self.registration_dates = array("q")
+
+    def append(self, row) -> None:
+        reader_id, name, email, phone, registration_date = row
+        self.ids.append(reader_id)
+        self.names.append(_text(name))
+        self.emails.append(email)
+        self.phones.append(phone)
+        self.registration_dates.append(registration_date)
+
+    def row(self, index) -> tuple:
+        return (self.ids[index], self.names[index], self.emails[index], self.phones[index],
+                from_db_date(self.registration_dates[index]))
+
+
+class LoanTable(_Table):
+    __slots__ = ("ids", "book_ids", "reader_ids", "loan_dates", "return_dates", "is_returned")
+    _model = Loan
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.book_ids = array("q")
+        self.reader_ids = array("q")
+        # Epoch seconds, as stored
+        self.loan_dates = array("q")
+        self.return_dates = array("q")
+        self.is_returned = array("b")
+
+    def append(self, row) -> None:
+        loan_id, book_id, reader_id, loan_date, return_date, is_returned = row
+        self.ids.append(loan_id)
+        self.book_ids.append(book_id)
+        self.reader_ids.append(reader_id)
+        self.loan_dates.append(loan_date)
+        self.return_dates.append(return_date)
+        self.is_returned.append(is_returned)
+
+    def row(self, index) -> tuple:
+        return (self.ids[index], self.book_ids[index], self.reader_ids[index],
+                from_db_date(self.loan_dates[index]), from_db_date(self.return_dates[index]),
+                bool(self.is_returned[index]))
+
+    def classify(self, as_of) -> tuple[list[str], list[int]]:
+        # Status ("returned", "active" or "overdue") and whole days overdue
+        # for every row, all against the same reference time
+        now = to_db_date(as_of)
+        if np is not None:
+            returned = np.frombuffer(self.is_returned, dtype=np.int8) != 0
+            late = now - np.frombuffer(self.return_dates, dtype=np.int64)
+            overdue = (late > 0) & ~returned
+            statuses = np.where(returned, "returned", np.where(overdue, "overdue", "active"))
+            return statuses.tolist(), np.where(overdue, late // _DAY, 0).tolist()
+        statuses, days = [], []
+        for returned, due in zip(self.is_returned, self.return_dates):
+            if returned:
+                statuses.append("returned")
+                days.append(0)
+            elif now > due:
+                statuses.append("overdue")
+                days.append((now - due) // _DAY)
+            else:
+                statuses.append("active")
+                days.append(0)
+        return statuses, days
@@ -0,0 +1,148 @@
+import queue
+import threading
+from concurrent.futures import Future
+from database.pool import PooledDatabaseManager
+
+WRITE_BATCH_SIZE = 500
+
+_STOP = object()
+
+
+def _resolve(future, result, error) -> None:
+    if error is None:
+        future.set_result(result)
+    else:
+        future.set_exception(error)
+
+
+class GroupCommitWriter:
+    # SQLite has a single writer anyway, so writes from any thread are queued
+    # to one writer thread that owns its own manager. Whatever is pending when
+    # it wakes up is committed as one transaction (group commit); each
+    # operation runs in its own savepoint, so one failing call does not undo
+    # the rest of its batch. Futures resolve only after the commit
+    def __init__(self, db_path="library.db", max_batch=WRITE_BATCH_SIZE,
+                 manager_factory=PooledDatabaseManager) -> None:
+        if max_batch <= 0:
+            raise ValueError("Batch size must be positive")
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self._manager_factory = manager_factory
+        self._queue = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self.batches = 0
+        self.operations = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.max_queue_depth = 0
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, operation, *args, **kwargs) -> Future:
+        # operation is a DatabaseManager method name ("add_loan") or a
+        # callable taking the writer's manager as its first argument
+        future = Future()
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("Writer is closed")
+            self._queue.put((future, operation, args, kwargs))
+        return future
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self.batches,
+            "operations": self.operations,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "mean_batch_size": self.operations / self.batches if self.batches else 0.0,
+        }
+
+    def close(self, timeout=None) -> None:
+        # Pending operations are still committed before the thread exits
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        try:
+            db = self._manager_factory(self.db_path)
+        except Exception as error:
+            self._fail_all(error)
+            return
+        try:
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                if batch:
+                    self._flush(db, batch)
+        finally:
+            db.close()
+
+    def _next_batch(self) -> tuple[list, bool]:
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize() + 1)
+        batch = [item]
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _flush(self, db, batch) -> None:
+        # Cancelled futures are skipped; the rest are marked running so they
+        # can no longer be cancelled
+        running = [item for item in batch if item[0].set_running_or_notify_cancel()]
+        try:
+            with db.transaction():
+                outcomes = [(item[0], *self._apply(db, *item[1:])) for item in running]
+        except Exception as error:
+            # The commit itself failed: nothing in the batch was written
+            for future, *_ in running:
+                future.set_exception(error)
+            return
+        for future, result, error in outcomes:
+            _resolve(future, result, error)
+        self.batches += 1
+        self.operations += len(outcomes)
+        self.last_batch_size = len(outcomes)
+        self.max_batch_size = max(self.max_batch_size, len(outcomes))
+
+    @staticmethod
+    def _apply(db, operation, args, kwargs) -> tuple:
+        try:
+            with db.savepoint():
+                if callable(operation):
+                    return operation(db, *args, **kwargs), None
+                return getattr(db, operation)(*args, **kwargs), None
+        except Exception as error:
+            return None, error
+
+    def _fail_all(self, error) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            future = item[0]
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
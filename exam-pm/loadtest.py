@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест HTTP сервера библиотеки
+Без --url поднимает сервер на временной базе с тестовыми данными
+
+    python loadtest.py [--url http://127.0.0.1:8080] [--clients 8] [--requests 500]
+"""
+
+import argparse
+import http.client
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from controllers.book_controller import BookController
+    from database.database_manager import DatabaseManager
+    from server import LibraryServer
+except ImportError as e:
+    print(f"Ошибка импорта модулей: {e}")
+    sys.exit(1)
+
+
+def _seed(db_path, books) -> None:
+    db = DatabaseManager(db_path)
+    try:
+        BookController(db).add_books_many(
+            {"title": f"Book {i}", "author": f"Author {i % 500}", "isbn": f"978-{i:09d}",
+             "year": 1950 + i % 70, "quantity": 1 + i % 5}
+            for i in range(books)
+        )
+    finally:
+        db.close()
+
+
+def _paths(books):
+    # Mix of point lookups, list pages and searches
+    while True:
+        roll = random.random()
+        if roll < 0.6:
+            yield f"/books/{random.randint(1, books)}"
+        elif roll < 0.85:
+            yield f"/books?after_id={random.randint(0, books)}&limit=50"
+        else:
+            yield f"/books/search?q=author+{random.randint(0, 499)}&limit=20"
+
+
+def _client(host, port, count, books, latencies, errors) -> None:
+    # One keep-alive connection per simulated terminal
+    conn = http.client.HTTPConnection(host, port)
+    paths = _paths(books)
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            conn.request("GET", next(paths))
+            response = conn.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+            if response.status >= 400:
+                errors.append(response.status)
+    finally:
+        conn.close()
+
+
+def _percentile(values, fraction) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(host, port, clients, requests, books) -> None:
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=_client, args=(host, port, requests, books, latencies, errors))
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests, {clients} clients, {elapsed:.2f} s, {len(errors)} errors")
+    print(f"{len(latencies) / elapsed:.0f} req/s")
+    print(f"p50 {_percentile(latencies, 0.50) * 1000:.2f} ms, "
+          f"p99 {_percentile(latencies, 0.99) * 1000:.2f} ms")
+
+
+def main():
+    """Запуск нагрузочного теста"""
+    parser = argparse.ArgumentParser(description="Load test for the library HTTP server")
+    parser.add_argument("--url", help="running server; a local one is started if omitted")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="requests per client")
+    parser.add_argument("--books", type=int, default=10000, help="books to seed locally")
+    args = parser.parse_args()
+
+    if args.url:
+        url = urlsplit(args.url)
+        run(url.hostname, url.port or 80, args.clients, args.requests, args.books)
+        return
+
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    _seed(db_path, args.books)
+    server = LibraryServer(("127.0.0.1", 0), db_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        run("127.0.0.1", server.server_port, args.clients, args.requests, args.books)
+    finally:
+        server.shutdown()
+        server.server_close()
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
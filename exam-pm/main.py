@@ -15,7 +15,7 @@ try:
     from controllers.book_controller import BookController
     from controllers.loan_controller import LoanController
     from controllers.reader_controller import ReaderController
-    from database.database_manager import DatabaseManager
+    from database.cache import PooledCachingDatabaseManager
     from views.main_window import MainWindow
 except ImportError as e:
     print(f"Ошибка импорта модулей: {e}")
@@ -26,8 +26,8 @@ except ImportError as e:
 def main():
     """Главная функция приложения"""
     try:
-        # Инициализация базы данных
-        db_manager = DatabaseManager("database/library.db")
+        # Инициализация базы данных (отдельное соединение на каждый поток загрузки)
+        db_manager = PooledCachingDatabaseManager("database/library.db")
         db_manager.create_tables()
 
         # Инициализация контроллеров
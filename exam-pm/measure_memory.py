@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Per-row memory of large result sets: dict-based objects (the previous model
+layout), __slots__ models and the columnar tables.
+
+    python measure_memory.py [rows]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+from database.database_manager import DatabaseManager
+from models.book import Book
+from models.reader import Reader
+from models.loan import Loan
+
+
+class _DictRecord:
+    # Stand-in for the models before __slots__: one __dict__ per instance
+    def __init__(self, fields, row) -> None:
+        self.__dict__.update(zip(fields, row))
+
+
+def _measure(load) -> int:
+    tracemalloc.start()
+    result = load()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def _fill(db, rows) -> None:
+    start = datetime(2020, 1, 1)
+    db.add_books_many(
+        Book(f"Title {i}", f"Author {i % 2000}", f"978-{i:09d}", 1950 + i % 70, 1 + i % 5)
+        for i in range(rows)
+    )
+    db.add_readers_many(
+        Reader(f"Reader {i % 5000}", f"reader{i}@example.com", f"+7{i:010d}")
+        for i in range(rows)
+    )
+    db.add_loans_many(
+        Loan(1 + i % rows, 1 + (i * 7) % rows, start + timedelta(hours=i),
+             start + timedelta(hours=i, days=14))
+        for i in range(rows)
+    )
+
+
+def main(rows) -> None:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    db = DatabaseManager(path)
+    try:
+        _fill(db, rows)
+        print(f"{rows} rows per table, bytes per row")
+        print(f"{'table':<10}{'__dict__':>12}{'__slots__':>12}{'columnar':>12}")
+        for table, fields in (("books", Book.__slots__), ("readers", Reader.__slots__),
+                              ("loans", Loan.__slots__)):
+            get_all = getattr(db, f"get_all_{table}")
+            dicts = _measure(lambda: [_DictRecord(fields, [getattr(o, f) for f in fields])
+                                      for o in get_all()])
+            slots = _measure(get_all)
+            columnar = _measure(lambda: get_all(columnar=True))
+            print(f"{table:<10}{dicts / rows:>12.1f}{slots / rows:>12.1f}{columnar / rows:>12.1f}")
+    finally:
+        db.close()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -1,6 +1,8 @@
 from datetime import datetime
 
 class Book:
+    __slots__ = ("id", "title", "author", "isbn", "year", "quantity", "available")
+
     def __init__(self, title, author, isbn, year, quantity) -> None:
         if not title or not title.strip():
             raise ValueError("Title cannot be empty")
@@ -21,6 +23,14 @@ class Book:
         self.quantity = quantity
         self.available = quantity
 
+    @classmethod
+    def from_row(cls, row) -> "Book":
+        # Trusted path for stored rows (id, title, author, isbn, year,
+        # quantity, available): skips validation and normalisation
+        book = cls.__new__(cls)
+        book.id, book.title, book.author, book.isbn, book.year, book.quantity, book.available = row
+        return book
+
     def borrow_book(self) -> bool:
         if self.available > 0:
             self.available -= 1
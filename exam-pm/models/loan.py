@@ -2,6 +2,8 @@
 from datetime import datetime, timedelta
 
 class Loan:
+    __slots__ = ("id", "book_id", "reader_id", "loan_date", "return_date", "is_returned")
+
     def __init__(self, book_id, reader_id, loan_date, return_date) -> None:
         self.id = None
         self.book_id = book_id
@@ -10,16 +12,27 @@ class Loan:
         self.return_date = return_date
         self.is_returned = False
 
+    @classmethod
+    def from_row(cls, row) -> "Loan":
+        # Trusted path for stored rows (id, book_id, reader_id, loan_date,
+        # return_date, is_returned)
+        loan = cls.__new__(cls)
+        (loan.id, loan.book_id, loan.reader_id,
+         loan.loan_date, loan.return_date, loan.is_returned) = row
+        return loan
+
     def return_book(self) -> bool:
         if not self.is_returned:
             self.is_returned = True
             return True
         return False
 
-    def is_overdue(self) -> bool:
-        return datetime.now() > self.return_date and not self.is_returned
+    def is_overdue(self, as_of=None) -> bool:
+        if as_of is None:
+            as_of = datetime.now()
+        return as_of > self.return_date and not self.is_returned
 
-    def to_dict(self) -> dict:
+    def to_dict(self, as_of=None) -> dict:
         return {
             "id": self.id,
             "book_id": self.book_id,
@@ -27,5 +40,5 @@ class Loan:
             "loan_date": self.loan_date.strftime("%Y-%m-%d %H:%M:%S"),
             "return_date": self.return_date.strftime("%Y-%m-%d %H:%M:%S"),
             "is_returned": self.is_returned,
-            "is_overdue": self.is_overdue()
+            "is_overdue": self.is_overdue(as_of)
         }
\ No newline at end of file
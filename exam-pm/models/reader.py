@@ -2,6 +2,8 @@ from datetime import datetime
 import re
 
 class Reader:
+    __slots__ = ("id", "name", "email", "phone", "registration_date")
+
     def __init__(self, name, email, phone) -> None:
         if not name or not name.strip():
             raise ValueError("Name cannot be empty")
@@ -16,6 +18,14 @@ class Reader:
         self.phone = phone.strip()
         self.registration_date = datetime.now()
 
+    @classmethod
+    def from_row(cls, row) -> "Reader":
+        # Trusted path for stored rows (id, name, email, phone,
+        # registration_date): skips validation and normalisation
+        reader = cls.__new__(cls)
+        reader.id, reader.name, reader.email, reader.phone, reader.registration_date = row
+        return reader
+
     def _is_valid_email(self, email) -> bool:
         pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
         return re.match(pattern, email) is not None
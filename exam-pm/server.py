@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+HTTP/JSON сервер системы управления библиотекой
+Открывает операции с книгами, читателями и выдачами для нескольких терминалов
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Добавляем путь к модулям проекта
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from controllers.book_controller import BookController
+    from controllers.loan_controller import LoanController
+    from controllers.reader_controller import ReaderController
+    from database.database_manager import PAGE_SIZE, SEARCH_LIMIT
+    from database.pool import PooledDatabaseManager
+    from models.book import Book
+    from models.reader import Reader
+except ImportError as e:
+    print(f"Ошибка импорта модулей: {e}")
+    sys.exit(1)
+
+MAX_PAGE_SIZE = 1000
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Columns a client may change through PATCH, with their JSON types;
+# available is not among them, it follows changes to quantity
+BOOK_FIELDS = {"title": str, "author": str, "isbn": str, "year": int, "quantity": int}
+READER_FIELDS = {"name": str, "email": str, "phone": str}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.strftime(DATE_FORMAT)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _parse_date(value) -> datetime | None:
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def _page(items, limit) -> dict:
+    # A full page means there may be more; the client passes next_after_id back
+    next_after_id = items[-1]["id"] if items and len(items) == limit else None
+    return {"items": items, "next_after_id": next_after_id}
+
+
+def _changes(body, fields) -> dict:
+    if not isinstance(body, dict) or not body:
+        raise ValueError("Expected a JSON object with fields to update")
+    unknown = set(body) - set(fields)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    for name, value in body.items():
+        # JSON true/false would pass as int
+        if not isinstance(value, fields[name]) or isinstance(value, bool):
+            raise ValueError(f"Field {name} must be of type {fields[name].__name__}")
+    return body
+
+
+def _loan_args(loan) -> dict:
+    return {
+        "book_id": int(loan["book_id"]),
+        "reader_id": int(loan["reader_id"]),
+        "loan_date": _parse_date(loan.get("loan_date")),
+        "return_date": _parse_date(loan.get("return_date")),
+    }
+
+
+class LibraryService:
+    # Maps (method, path) to controller calls; each handler returns the JSON
+    # payload, or None when the addressed record does not exist
+    def __init__(self, db_manager) -> None:
+        self.db = db_manager
+        self.books = BookController(db_manager)
+        self.readers = ReaderController(db_manager)
+        self.loans = LoanController(db_manager)
+        self.routes = [
+            ("GET", r"/books", self.list_books, 200),
+            ("POST", r"/books", self.add_book, 201),
+            ("POST", r"/books/bulk", self.add_books, 201),
+            ("GET", r"/books/search", self.search_books, 200),
+            ("GET", r"/books/(\d+)", self.get_book, 200),
+            ("PATCH", r"/books/(\d+)", self.update_book, 200),
+            ("DELETE", r"/books/(\d+)", self.delete_book, 200),
+            ("GET", r"/readers", self.list_readers, 200),
+            ("POST", r"/readers", self.add_reader, 201),
+            ("POST", r"/readers/bulk", self.add_readers, 201),
+            ("GET", r"/readers/search", self.search_readers, 200),
+            ("GET", r"/readers/(\d+)", self.get_reader, 200),
+            ("PATCH", r"/readers/(\d+)", self.update_reader, 200),
+            ("DELETE", r"/readers/(\d+)", self.delete_reader, 200),
+            ("GET", r"/loans", self.list_loans, 200),
+            ("POST", r"/loans", self.checkout, 201),
+            ("POST", r"/loans/bulk", self.checkout_many, 201),
+            ("GET", r"/loans/(\d+)", self.get_loan, 200),
+            ("POST", r"/loans/(\d+)/return", self.checkin, 200),
+        ]
+        self.routes = [
+            (method, re.compile(pattern), handler, status)
+            for method, pattern, handler, status in self.routes
+        ]
+
+    def dispatch(self, method, path, query, body) -> tuple[int, object]:
+        matches = [(route, route[1].fullmatch(path)) for route in self.routes]
+        matches = [(route, match) for route, match in matches if match]
+        if not matches:
+            return 404, {"error": "Not found"}
+        for (route_method, _, handler, status), match in matches:
+            if route_method == method:
+                return self._call(handler, status, match.groups(), query, body)
+        return 405, {"error": "Method not allowed"}
+
+    @staticmethod
+    def _call(handler, status, args, query, body) -> tuple[int, object]:
+        try:
+            payload = handler(*args, query=query, body=body)
+        except sqlite3.IntegrityError as e:
+            return 409, {"error": str(e)}
+        except KeyError as e:
+            return 400, {"error": f"Missing field: {e}"}
+        except (ValueError, TypeError, sqlite3.InterfaceError, sqlite3.ProgrammingError) as e:
+            return 400, {"error": str(e)}
+        if payload is None:
+            return 404, {"error": "Not found"}
+        return status, payload
+
+    @staticmethod
+    def _limit(query, default) -> int:
+        # SQLite reads a negative LIMIT as no limit at all
+        limit = min(int(query.get("limit", default)), MAX_PAGE_SIZE)
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        return limit
+
+    @classmethod
+    def _paging(cls, query) -> tuple[int, int]:
+        return int(query.get("after_id", 0)), cls._limit(query, PAGE_SIZE)
+
+    @classmethod
+    def _search_paging(cls, query) -> tuple[str, int, int]:
+        offset = int(query.get("offset", 0))
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+        return query.get("q", ""), cls._limit(query, SEARCH_LIMIT), offset
+
+    def list_books(self, query, body) -> dict:
+        after_id, limit = self._paging(query)
+        return _page([book.to_dict() for book in self.books.list_books(after_id, limit)], limit)
+
+    def search_books(self, query, body) -> dict:
+        return {"items": [book.to_dict() for book in self.books.search_books(
+            *self._search_paging(query))]}
+
+    def get_book(self, book_id, query, body) -> dict | None:
+        book = self.books.get_book(int(book_id))
+        return book.to_dict() if book else None
+
+    def add_book(self, query, body) -> dict:
+        return {"id": self.books.add_book(
+            body["title"], body["author"], body["isbn"], body["year"], body["quantity"]
+        )}
+
+    def add_books(self, query, body) -> dict:
+        # One transaction: a rejected row means nothing was stored
+        with self.db.transaction():
+            return {"ids": self.books.add_books_many(body)}
+
+    def update_book(self, book_id, query, body) -> dict | None:
+        changes = _changes(body, BOOK_FIELDS)
+        with self.db.transaction():
+            book = self.books.get_book(int(book_id))
+            if book is None:
+                return None
+            # The model checks the record as it would be stored
+            merged = {**book.to_dict(), **changes}
+            valid = Book(merged["title"], merged["author"], merged["isbn"], merged["year"],
+                         merged["quantity"])
+            changes = {name: getattr(valid, name) for name in changes}
+            if "quantity" in changes:
+                # Copies on loan stay on loan
+                changes["available"] = book.available + changes["quantity"] - book.quantity
+                if changes["available"] < 0:
+                    raise ValueError("Quantity is below the number of copies on loan")
+            self.books.update_book(book.id, **changes)
+        return {"updated": True}
+
+    def delete_book(self, book_id, query, body) -> dict | None:
+        return {"deleted": True} if self.books.delete_book(int(book_id)) else None
+
+    def list_readers(self, query, body) -> dict:
+        after_id, limit = self._paging(query)
+        readers = self.readers.list_readers(after_id, limit)
+        return _page([reader.to_dict() for reader in readers], limit)
+
+    def search_readers(self, query, body) -> dict:
+        return {"items": [reader.to_dict() for reader in self.readers.search_readers(
+            *self._search_paging(query))]}
+
+    def get_reader(self, reader_id, query, body) -> dict | None:
+        reader = self.readers.get_reader(int(reader_id))
+        return reader.to_dict() if reader else None
+
+    def add_reader(self, query, body) -> dict:
+        return {"id": self.readers.add_reader(body["name"], body["email"], body["phone"])}
+
+    def add_readers(self, query, body) -> dict:
+        # One transaction: a rejected row means nothing was stored
+        with self.db.transaction():
+            return {"ids": self.readers.add_readers_many(body)}
+
+    def update_reader(self, reader_id, query, body) -> dict | None:
+        changes = _changes(body, READER_FIELDS)
+        with self.db.transaction():
+            reader = self.readers.get_reader(int(reader_id))
+            if reader is None:
+                return None
+            merged = {**reader.to_dict(), **changes}
+            valid = Reader(merged["name"], merged["email"], merged["phone"])
+            self.readers.update_reader(
+                reader.id, **{name: getattr(valid, name) for name in changes}
+            )
+        return {"updated": True}
+
+    def delete_reader(self, reader_id, query, body) -> dict | None:
+        return {"deleted": True} if self.readers.delete_reader(int(reader_id)) else None
+
+    def list_loans(self, query, body) -> dict:
+        after_id, limit = self._paging(query)
+        loans = self.loans.list_loan_details(
+            status=query.get("status"),
+            reader_id=int(query["reader_id"]) if "reader_id" in query else None,
+            book_id=int(query["book_id"]) if "book_id" in query else None,
+            due_before=_parse_date(query.get("due_before")),
+            limit=limit,
+            after_id=after_id,
+        )
+        for loan, (status, days_overdue) in zip(loans, self.loans.classify(loans)):
+            loan["status"] = status
+            loan["days_overdue"] = days_overdue
+        return _page(loans, limit)
+
+    def get_loan(self, loan_id, query, body) -> dict | None:
+        loan = self.loans.get_loan(int(loan_id))
+        return loan.to_dict() if loan else None
+
+    def checkout(self, query, body) -> dict:
+        return {"id": self.loans.checkout(**_loan_args(body))}
+
+    def checkout_many(self, query, body) -> dict:
+        return {"ids": self.loans.checkout_many(_loan_args(loan) for loan in body)}
+
+    def checkin(self, loan_id, query, body) -> dict | None:
+        return {"returned": True} if self.loans.checkin(int(loan_id)) else None
+
+
+class LibraryRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps the connection open between requests. Headers and body
+    # go out as separate writes, so Nagle would hold the body back until the
+    # client's delayed ACK (~40 ms per request on a kept-alive connection)
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_PATCH(self) -> None:
+        self._handle("PATCH")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    def _handle(self, method) -> None:
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = self._content_length()
+        if length is None:
+            # Where the body ends is unknown, so the connection cannot be reused
+            self._send(400, {"error": "Invalid Content-Length"}, close=True)
+            return
+        # The body is always consumed so the next request on the connection
+        # starts at the right offset
+        raw = self.rfile.read(length)
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            self._send(400, {"error": "Invalid JSON"})
+            return
+        try:
+            response = self.server.service.dispatch(method, url.path, query, body)
+        except Exception:
+            self.log_error("Unhandled error on %s %s", method, self.path)
+            response = 500, {"error": "Internal server error"}
+        self._send(*response)
+
+    def _content_length(self) -> int | None:
+        # rfile.read(-1) would wait for the client to hang up
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            return None
+        return length if length >= 0 else None
+
+    def _send(self, status, payload, close=False) -> None:
+        data = json.dumps(payload, default=_json_default, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if close:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def finish(self) -> None:
+        super().finish()
+        # Each client connection has its own thread and database connection
+        self.server.db.release()
+
+    def log_message(self, format, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class LibraryServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, db_path, verbose=False) -> None:
+        self.db = PooledDatabaseManager(db_path)
+        self.service = LibraryService(self.db)
+        self.verbose = verbose
+        super().__init__(address, LibraryRequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.db.close()
+
+
+def main():
+    """Запуск HTTP сервера"""
+    parser = argparse.ArgumentParser(description="Library HTTP/JSON server")
+    parser.add_argument("--db", default="database/library.db")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = LibraryServer((args.host, args.port), args.db, args.verbose)
+    print(f"Сервер запущен на http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
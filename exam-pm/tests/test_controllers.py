@@ -2,8 +2,14 @@ import pytest
 import sys
 import os
 from datetime import datetime, timedelta
+import bisect
+import tkinter as tk
 import tempfile
-from database.database_manager import DatabaseManager
+import asyncio
+import http.client
+import json
+import threading
+from database.database_manager import BULK_CHUNK_SIZE, DatabaseManager
 
 # Добавляем путь к модулям проекта
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
@@ -11,6 +17,17 @@ sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from controllers.book_controller import BookController
 from controllers.reader_controller import ReaderController
 from controllers.loan_controller import LoanController
+from controllers.async_controllers import (
+    AsyncBookController, AsyncReaderController, AsyncLoanController
+)
+from database.async_manager import AsyncDatabaseManager
+from server import LibraryServer
+from collections import OrderedDict, namedtuple
+from operator import attrgetter
+from views.background_loader import Debouncer
+from views.virtual_tree import (
+    KeysetSource, ListSource, LiveSearch, SearchSource, VirtualTreeview
+)
 
 
 class TestBookController:
@@ -137,6 +154,47 @@ class TestBookController:
         book = self.controller.get_book(book_id)
         assert book.available == 3
 
+    def test_list_and_iter_books(self):
+        """Тест постраничного получения и обхода книг"""
+        for i in range(3):
+            self.controller.add_book(f"Книга {i}", "Автор", f"isbn-{i}", 2020, 1)
+
+        page = self.controller.list_books(limit=2)
+        assert len(page) == 2
+        assert len(self.controller.list_books(after_id=page[-1].id)) == 1
+        assert len(list(self.controller.iter_books(batch_size=2))) == 3
+
+    def test_borrow_book_unavailable(self):
+        """Тест выдачи книги без доступных экземпляров"""
+        book_id = self.controller.add_book("Книга", "Автор", "123-456", 2020, 1)
+
+        assert self.controller.borrow_book(book_id) == True
+        assert self.controller.borrow_book(book_id) == False
+        assert self.controller.get_book(book_id).available == 0
+
+    def test_return_book_not_borrowed(self):
+        """Тест возврата книги, которая не выдавалась"""
+        book_id = self.controller.add_book("Книга", "Автор", "123-456", 2020, 1)
+
+        assert self.controller.return_book(book_id) == False
+        assert self.controller.get_book(book_id).available == 1
+
+    def test_add_books_many(self):
+        """Тест пакетного добавления книг с валидацией"""
+        book_ids = self.controller.add_books_many(
+            {"title": f"Книга {i}", "author": "Автор", "isbn": f"isbn-{i}",
+             "year": 2020, "quantity": 1}
+            for i in range(4)
+        )
+        assert len(book_ids) == 4
+        assert self.controller.get_book(book_ids[0]).title == "Книга 0"
+
+        with pytest.raises(ValueError):
+            self.controller.add_books_many(
+                [{"title": "", "author": "Автор", "isbn": "isbn-x",
+                  "year": 2020, "quantity": 1}]
+            )
+
 
 class TestReaderController:
     """Тесты для ReaderController"""
@@ -231,6 +289,43 @@ class TestReaderController:
         loans = self.controller.get_reader_loans(reader_id)
         assert isinstance(loans, list)
 
+    def test_search_readers(self):
+        """Тест поиска читателей"""
+        reader_id = self.controller.add_reader(
+            "Иван Иванов", "ivan@example.com", "+7-999-123-45-67"
+        )
+        self.controller.add_reader("Петр Петров", "petr@example.com", "+7-999-123-45-68")
+
+        results = self.controller.search_readers("иван")
+        assert [reader.id for reader in results] == [reader_id]
+
+    def test_find_readers(self):
+        """Тест подбора читателя по префиксу имени, почты и по ID"""
+        ivan = self.controller.add_reader("Иван Иванов", "ivan@example.com", "+7-999-123-45-67")
+        petr = self.controller.add_reader("Петр Петров", "petr@example.com", "+7-999-123-45-68")
+
+        assert [r.id for r in self.controller.find_readers("ив")] == [ivan]
+        assert [r.id for r in self.controller.find_readers("petr@ex")] == [petr]
+        assert [r.id for r in self.controller.find_readers(str(petr))] == [petr]
+        assert [r.id for r in self.controller.find_readers("  ", limit=1)] == [ivan]
+        # Не-ASCII цифры и числа вне диапазона SQLite не ищутся по id
+        assert self.controller.find_readers("²") == []
+        assert self.controller.find_readers("٣") == []
+        assert self.controller.find_readers(str(2 ** 63)) == []
+
+    def test_add_readers_many(self):
+        """Тест пакетного добавления читателей с валидацией"""
+        reader_ids = self.controller.add_readers_many([
+            {"name": "Читатель 1", "email": "r1@example.com", "phone": "+7-999-111-11-11"},
+            {"name": "Читатель 2", "email": "r2@example.com", "phone": "+7-999-222-22-22"},
+        ])
+        assert len(reader_ids) == 2
+
+        with pytest.raises(ValueError):
+            self.controller.add_readers_many(
+                [{"name": "Имя", "email": "некорректный-email", "phone": "+7"}]
+            )
+
 
 class TestLoanController:
     """Тесты для LoanController"""
@@ -373,6 +468,906 @@ class TestLoanController:
         for loan in reader_loans:
             assert loan.reader_id == reader_id
 
+    def test_checkout(self):
+        """Тест выдачи книги с уменьшением доступных экземпляров"""
+        book_id = self.book_controller.add_book("Книга", "Автор", "123-456", 2020, 1)
+        reader_id = self.reader_controller.add_reader(
+            "Читатель", "reader@example.com", "+7-999-123-45-67"
+        )
+
+        loan_id = self.controller.checkout(book_id, reader_id)
+        assert self.controller.get_loan(loan_id).book_id == book_id
+        assert self.book_controller.get_book(book_id).available == 0
+
+        # Экземпляров не осталось: выдача не создается
+        with pytest.raises(ValueError):
+            self.controller.checkout(book_id, reader_id)
+        assert len(self.controller.get_all_loans()) == 1
+
+    def test_checkin(self):
+        """Тест возврата книги с увеличением доступных экземпляров"""
+        book_id = self.book_controller.add_book("Книга", "Автор", "123-456", 2020, 1)
+        reader_id = self.reader_controller.add_reader(
+            "Читатель", "reader@example.com", "+7-999-123-45-67"
+        )
+        loan_id = self.controller.checkout(book_id, reader_id)
+
+        assert self.controller.checkin(loan_id) == True
+        assert self.controller.get_loan(loan_id).is_returned == True
+        assert self.book_controller.get_book(book_id).available == 1
+
+        # Повторный возврат не меняет счетчик
+        assert self.controller.checkin(loan_id) == False
+        assert self.book_controller.get_book(book_id).available == 1
+
+    def test_get_loans_by_status(self):
+        """Тест получения выдач по статусу"""
+        book_id = self.book_controller.add_book("Книга", "Автор", "123-456", 2020, 2)
+        reader_id = self.reader_controller.add_reader(
+            "Читатель", "reader@example.com", "+7-999-123-45-67"
+        )
+        loan_id = self.controller.checkout(book_id, reader_id)
+        returned_id = self.controller.checkout(book_id, reader_id)
+        self.controller.checkin(returned_id)
+
+        assert [loan.id for loan in self.controller.get_loans(status="active")] == [loan_id]
+        assert [loan.id for loan in self.controller.get_loans(status="returned")] == [returned_id]
+        assert self.controller.get_loans(status="overdue") == []
+
+    def test_list_loan_details(self):
+        """Тест списка выдач с названием книги и именем читателя"""
+        book_id = self.book_controller.add_book("Книга", "Автор", "123-456", 2020, 2)
+        reader_id = self.reader_controller.add_reader(
+            "Читатель", "reader@example.com", "+7-999-123-45-67"
+        )
+        loan_id = self.controller.checkout(book_id, reader_id)
+
+        details = self.controller.list_loan_details()
+        assert details[0]["id"] == loan_id
+        assert details[0]["book_title"] == "Книга"
+        assert details[0]["reader_name"] == "Читатель"
+        assert len(list(self.controller.iter_loan_details(status="active"))) == 1
+        assert self.controller.get_loan_details(loan_id) == details[0]
+
+    def test_create_loans_many(self):
+        """Тест пакетного создания выдач со сроком по умолчанию"""
+        book_id = self.book_controller.add_book("Книга", "Автор", "123-456", 2020, 2)
+        reader_id = self.reader_controller.add_reader(
+            "Читатель", "reader@example.com", "+7-999-123-45-67"
+        )
+
+        loan_ids = self.controller.create_loans_many(
+            [{"book_id": book_id, "reader_id": reader_id}] * 2
+        )
+        assert len(loan_ids) == 2
+
+        loan = self.controller.get_loan(loan_ids[0])
+        assert (loan.return_date - loan.loan_date).days == 14
+
+    def test_classify_loans(self):
+        """Тест пакетного расчета статуса и дней просрочки по одному времени"""
+        book_id = self.book_controller.add_book("Книга", "Автор", "123-456", 2020, 5)
+        reader_id = self.reader_controller.add_reader(
+            "Читатель", "reader@example.com", "+7-999-123-45-67"
+        )
+        as_of = datetime(2024, 6, 15, 12, 0, 0)
+        due_dates = [as_of + timedelta(days=1), as_of - timedelta(days=3, hours=2),
+                     as_of - timedelta(days=10)]
+        loan_ids = [
+            self.controller.create_loan(book_id, reader_id, due - timedelta(days=14), due)
+            for due in due_dates
+        ]
+        self.controller.return_book(loan_ids[2])
+        expected = [("active", 0), ("overdue", 3), ("returned", 0)]
+
+        assert self.controller.classify(self.controller.get_all_loans(), as_of) == expected
+        assert self.controller.classify(self.controller.list_loan_details(), as_of) == expected
+        table = self.db_manager.get_all_loans(columnar=True)
+        assert self.controller.classify(table, as_of) == expected
+
+    def test_matches_status_follows_filters(self):
+        """Тест совпадения фильтра строки с фильтром запроса выдач"""
+        book_id = self.book_controller.add_book("Книга", "Автор", "123-456", 2020, 5)
+        reader_id = self.reader_controller.add_reader(
+            "Читатель", "reader@example.com", "+7-999-123-45-67"
+        )
+        now = datetime.now()
+        # Обычная, просроченная (задним числом) и возвращённая выдачи
+        for due in (now + timedelta(days=7), now - timedelta(days=3), now - timedelta(days=10)):
+            self.controller.create_loan(book_id, reader_id, due - timedelta(days=14), due)
+        self.controller.return_book(self.controller.list_loan_details()[2]["id"])
+
+        loans = self.controller.list_loan_details()
+        for status in (None, "active", "overdue", "returned"):
+            listed = [loan["id"] for loan in self.controller.list_loan_details(status=status)]
+            matched = [
+                loan["id"] for loan in loans if self.controller.matches_status(loan, status)
+            ]
+            assert matched == listed, status
+        # Просроченная выдача остаётся в списке активных
+        assert len(self.controller.list_loan_details(status="active")) == 2
+        with pytest.raises(ValueError):
+            self.controller.matches_status(loans[0], "lost")
+
+    def test_classify_columnar_without_numpy(self, monkeypatch):
+        """Тест колоночного расчета статусов без NumPy"""
+        import database.tables as tables
+        monkeypatch.setattr(tables, "np", None)
+        book_id = self.book_controller.add_book("Книга", "Автор", "123-456", 2020, 5)
+        reader_id = self.reader_controller.add_reader(
+            "Читатель", "reader@example.com", "+7-999-123-45-67"
+        )
+        as_of = datetime(2024, 6, 15, 12, 0, 0)
+        self.controller.create_loan(book_id, reader_id, as_of - timedelta(days=30),
+                                    as_of - timedelta(days=16))
+
+        table = self.db_manager.get_all_loans(columnar=True)
+        assert table.classify(as_of) == (["overdue"], [16])
+
+
+class TestAsyncControllers:
+    """Тесты для асинхронных контроллеров"""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+
+    def test_checkout_and_checkin(self):
+        """Тест выдачи и возврата книги через асинхронные контроллеры"""
+        async def scenario():
+            async with AsyncDatabaseManager(self.temp_db.name) as adb:
+                books = AsyncBookController(adb)
+                readers = AsyncReaderController(adb)
+                loans = AsyncLoanController(adb)
+
+                book_id = await books.add_book("Книга", "Автор", "123-456", 2020, 1)
+                reader_id = await readers.add_reader(
+                    "Читатель", "reader@example.com", "+7-999-123-45-67"
+                )
+                loan_id = await loans.checkout(book_id, reader_id)
+                with pytest.raises(ValueError):
+                    await loans.checkout(book_id, reader_id)
+                assert await loans.checkin(loan_id) == True
+                details = [loan async for loan in loans.iter_loan_details(status="returned")]
+                return (await books.get_book(book_id)).available, details
+
+        available, details = asyncio.run(scenario())
+        assert available == 1
+        assert details[0]["book_title"] == "Книга"
+
+    def test_async_iteration(self):
+        """Тест асинхронного обхода читателей"""
+        async def scenario():
+            async with AsyncDatabaseManager(self.temp_db.name) as adb:
+                readers = AsyncReaderController(adb)
+                await readers.add_readers_many(
+                    {"name": f"Читатель {i}", "email": f"r{i}@example.com", "phone": "+7-1"}
+                    for i in range(7)
+                )
+                return [reader.name async for reader in readers.iter_readers(batch_size=3)]
+
+        names = asyncio.run(scenario())
+        assert names == [f"Читатель {i}" for i in range(7)]
+
+
+class TestLibraryServer:
+    """Тесты для HTTP/JSON сервера"""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        self.server = LibraryServer(("127.0.0.1", 0), self.temp_db.name)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.server.server_port)
+
+    def teardown_method(self):
+        self.conn.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def request(self, method, path, body=None):
+        data = None if body is None else json.dumps(body)
+        self.conn.request(method, path, data, {"Content-Type": "application/json"})
+        response = self.conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    def test_books_crud_and_pagination(self):
+        """Тест работы с книгами и постраничного списка по одному соединению"""
+        status, result = self.request("POST", "/books/bulk", [
+            {"title": f"Книга {i}", "author": "Автор", "isbn": f"isbn-{i}",
+             "year": 2020, "quantity": 1}
+            for i in range(3)
+        ])
+        assert status == 201
+        book_ids = result["ids"]
+
+        status, page = self.request("GET", "/books?limit=2")
+        assert status == 200
+        assert [book["id"] for book in page["items"]] == book_ids[:2]
+        status, page = self.request("GET", f"/books?limit=2&after_id={page['next_after_id']}")
+        assert [book["id"] for book in page["items"]] == book_ids[2:]
+        assert page["next_after_id"] is None
+
+        assert self.request("PATCH", f"/books/{book_ids[0]}", {"title": "Новая"})[0] == 200
+        assert self.request("GET", f"/books/{book_ids[0]}")[1]["title"] == "Новая"
+        assert self.request("PATCH", f"/books/{book_ids[0]}", {"id; --": 1})[0] == 400
+        assert self.request("DELETE", f"/books/{book_ids[0]}")[0] == 200
+        assert self.request("GET", f"/books/{book_ids[0]}")[0] == 404
+
+    def test_patch_validation(self):
+        """Тест проверки изменений книги и читателя по правилам моделей"""
+        book_id = self.request("POST", "/books", {
+            "title": "Книга", "author": "Автор", "isbn": "123-456", "year": 2020, "quantity": 2
+        })[1]["id"]
+        reader_id = self.request("POST", "/readers", {
+            "name": "Читатель", "email": "reader@example.com", "phone": "+7-999-123-45-67"
+        })[1]["id"]
+        path = f"/books/{book_id}"
+
+        assert self.request("PATCH", path, {"available": 50})[0] == 400
+        assert self.request("PATCH", path, {"title": ""})[0] == 400
+        assert self.request("PATCH", path, {"title": {"x": 1}})[0] == 400
+        assert self.request("PATCH", path, {"year": True})[0] == 400
+        assert self.request("PATCH", f"/readers/{reader_id}", {"email": "bad"})[0] == 400
+        assert self.request("PATCH", "/books/999", {"title": "Новая"})[0] == 404
+
+        # Число доступных экземпляров следует за количеством
+        assert self.request("POST", "/loans", {
+            "book_id": book_id, "reader_id": reader_id
+        })[0] == 201
+        assert self.request("PATCH", path, {"quantity": 0})[0] == 400
+        assert self.request("PATCH", path, {"quantity": 3, "title": " Новая "})[0] == 200
+        book = self.request("GET", path)[1]
+        assert (book["title"], book["quantity"], book["available"]) == ("Новая", 3, 2)
+
+    def test_loans_checkout_and_return(self):
+        """Тест выдачи и возврата книги через HTTP"""
+        book_id = self.request("POST", "/books", {
+            "title": "Книга", "author": "Автор", "isbn": "123-456", "year": 2020, "quantity": 1
+        })[1]["id"]
+        reader_id = self.request("POST", "/readers", {
+            "name": "Читатель", "email": "reader@example.com", "phone": "+7-999-123-45-67"
+        })[1]["id"]
+
+        status, result = self.request("POST", "/loans", {
+            "book_id": book_id, "reader_id": reader_id
+        })
+        assert status == 201
+        loan_id = result["id"]
+        status, result = self.request("POST", "/loans", {
+            "book_id": book_id, "reader_id": reader_id
+        })
+        assert status == 400
+        assert result["error"] == "Book is not available"
+
+        status, page = self.request("GET", "/loans?status=active")
+        assert page["items"][0]["book_title"] == "Книга"
+        assert page["items"][0]["status"] == "active"
+        assert self.request("POST", f"/loans/{loan_id}/return")[0] == 200
+        assert self.request("POST", f"/loans/{loan_id}/return")[0] == 404
+
+    def test_checkout_unknown_reader(self):
+        """Тест отказа в выдаче несуществующему читателю"""
+        book_id = self.request("POST", "/books", {
+            "title": "Книга", "author": "Автор", "isbn": "123-456", "year": 2020, "quantity": 1
+        })[1]["id"]
+
+        status, result = self.request("POST", "/loans", {"book_id": book_id, "reader_id": 999})
+        assert status == 400
+        assert result["error"] == "Reader not found"
+        assert self.request("GET", f"/books/{book_id}")[1]["available"] == 1
+
+    def test_bulk_insert_is_atomic(self):
+        """Тест того, что ошибка в пакете не сохраняет ни одной записи"""
+        readers = [
+            {"name": f"Читатель {i}", "email": f"r{i}@example.com", "phone": "+7-999"}
+            for i in range(BULK_CHUNK_SIZE + 1)
+        ]
+        # Дубликат email попадает во второй блок записи
+        readers[-1]["email"] = readers[0]["email"]
+
+        assert self.request("POST", "/readers/bulk", readers)[0] == 409
+        assert self.request("GET", "/readers")[1]["items"] == []
+
+    def test_errors(self):
+        """Тест ответов на некорректные запросы"""
+        assert self.request("GET", "/unknown")[0] == 404
+        assert self.request("DELETE", "/books")[0] == 405
+        status, result = self.request("POST", "/readers", {"name": "Читатель"})
+        assert status == 400
+        assert "email" in result["error"]
+
+    def test_search_paging_validation(self):
+        """Тест отказа в поиске с отрицательными limit и offset"""
+        self.request("POST", "/readers", {
+            "name": "Читатель", "email": "reader@example.com", "phone": "+7-999-123-45-67"
+        })
+        for path in ("/books/search", "/readers/search"):
+            for params in ("limit=-1", "limit=0", "offset=-1", "q=1&offset=-1"):
+                status, result = self.request("GET", f"{path}?q=reader&{params}")
+                assert status == 400, (path, params)
+        status, result = self.request("GET", "/readers/search?q=reader&limit=1")
+        assert status == 200
+        assert len(result["items"]) == 1
+
+    def test_invalid_content_length(self):
+        """Тест ответа 400 и закрытия соединения при неверном Content-Length"""
+        for length in ("-1", "abc"):
+            conn = http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=5)
+            try:
+                conn.putrequest("POST", "/books")
+                conn.putheader("Content-Length", length)
+                conn.endheaders()
+                response = conn.getresponse()
+                assert response.status == 400
+                assert json.loads(response.read())["error"] == "Invalid Content-Length"
+                assert response.will_close == True
+            finally:
+                conn.close()
+
+
+def keyset_over(data):
+    """KeysetSource над списком возрастающих ключей, который можно менять"""
+    def list_page(after, limit, offset=0):
+        return [key for key in data if key > after][offset:offset + limit]
+
+    return KeysetSource(list_page, lambda: len(data), key=lambda key: key)
+
+
+class TestTableSources:
+    """Тесты источников строк виртуальной таблицы (без Tk)"""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        self.db_manager = DatabaseManager(self.temp_db.name)
+        self.controller = BookController(self.db_manager)
+        self.controller.add_books_many(
+            {"title": f"Книга {i}", "author": "Автор", "isbn": f"978-{i}",
+             "year": 2000, "quantity": 1}
+            for i in range(10)
+        )
+        self.ids = [book.id for book in self.controller.get_all_books()]
+
+    def teardown_method(self):
+        self.db_manager.close()
+
+    def test_keyset_source_windows(self):
+        """Тест чтения окон KeysetSource от ближайшей известной границы"""
+        calls = []
+
+        def list_page(after_id, limit, offset=0):
+            calls.append((after_id, offset))
+            return self.controller.list_books(after_id, limit, offset)
+
+        source = KeysetSource(list_page, self.controller.count_books)
+        assert source.count() == 10
+
+        fetched = [[book.id for book in source.fetch(offset, 4)] for offset in (0, 4, 8)]
+        assert fetched == [self.ids[0:4], self.ids[4:8], self.ids[8:10]]
+        # Каждая следующая страница читается диапазоном от ключа предыдущей
+        assert calls == [(0, 0), (self.ids[3], 0), (self.ids[7], 0)]
+
+        # Окно внутри известной страницы отсчитывается от её начала
+        calls.clear()
+        assert [book.id for book in source.fetch(6, 3)] == self.ids[6:9]
+        assert calls == [(self.ids[3], 2)]
+
+        # За концом данных окно пустое
+        assert source.fetch(10, 4) == []
+        assert source.fetch(20, 4) == []
+
+        # После reset известные границы забываются
+        source.reset()
+        calls.clear()
+        assert [book.id for book in source.fetch(6, 3)] == self.ids[6:9]
+        assert calls == [(0, 6)]
+
+    def test_keyset_source_shift(self):
+        """Тест сдвига границ KeysetSource при вставке и удалении строк"""
+        data = list(range(10, 110, 10))
+        source = keyset_over(data)
+        for offset in range(0, 10, 4):
+            source.fetch(offset, 4)
+        # Границы страниц: после 40 идёт строка 4, после 80 - строка 8
+        assert source._offsets == [0, 4, 8, 10]
+
+        changes = [
+            ("removed", 20),   # до окна
+            ("removed", 40),   # ключ самой границы
+            ("removed", 60),   # внутри окна
+            ("removed", 100),  # последняя строка
+            ("inserted", 15),  # снова до окна
+            ("inserted", 85),  # сразу после границы
+            ("inserted", 110),  # в конец
+        ]
+        for change, key in changes:
+            if change == "removed":
+                index = data.index(key)
+                data.remove(key)
+            else:
+                index = bisect.bisect(data, key)
+                data.insert(index, key)
+            getattr(source, change)(index, key)
+            # Любое окно, прочитанное от сдвинутых границ, совпадает с данными
+            for offset in range(len(data) + 1):
+                for limit in (1, 3, 4):
+                    assert source.fetch(offset, limit) == data[offset:offset + limit], (key, offset)
+
+    def test_list_source_windows(self):
+        """Тест чтения окон ListSource из одного запроса"""
+        loads = []
+
+        def load():
+            loads.append(1)
+            return self.controller.get_all_books()
+
+        source = ListSource(load)
+        assert source.count() == 10
+        assert source.count() == 10
+        assert len(loads) == 1
+
+        assert [book.id for book in source.fetch(0, 4)] == self.ids[0:4]
+        assert [book.id for book in source.fetch(8, 4)] == self.ids[8:10]
+        assert source.fetch(10, 4) == []
+
+        # reset перечитывает данные при следующем count()
+        self.controller.add_book("Новая", "Автор", "978-new", 2001, 1)
+        source.reset()
+        assert source.count() == 11
+        assert len(loads) == 2
+
+    def search_source(self, query, batch):
+        calls = []
+
+        def search(limit, offset):
+            calls.append((limit, offset))
+            return self.controller.search_books(query, limit, offset)
+
+        return SearchSource(search, batch=batch), calls
+
+    def test_search_source_more(self):
+        """Тест дочитывания результатов поиска пачками"""
+        source, calls = self.search_source("книга", batch=4)
+        assert source.count() == 4
+        assert source.has_more == True
+
+        source.more()
+        assert source.count() == 8
+        # Читается только новая пачка
+        assert calls == [(4, 0), (4, 4)]
+        assert source.has_more == True
+
+        # Последняя пачка неполная: больше читать нечего
+        source.more()
+        assert source.count() == 10
+        assert source.has_more == False
+        source.more()
+        assert source.count() == 10
+        assert len(calls) == 3
+        assert [book.id for book in source.fetch(8, 4)] == self.ids[8:10]
+
+    def test_search_source_exact_batches(self):
+        """Тест поиска, результаты которого делятся на пачки без остатка"""
+        source, calls = self.search_source("книга", batch=5)
+        assert source.count() == 5
+        source.more()
+        assert source.count() == 10
+        # Полная пачка не говорит о конце данных, его показывает пустая
+        assert source.has_more == True
+        source.more()
+        assert source.count() == 10
+        assert source.has_more == False
+        assert calls == [(5, 0), (5, 5), (5, 10)]
+
+    def test_search_source_empty(self):
+        """Тест пустого результата поиска"""
+        source, calls = self.search_source("словарь", batch=4)
+        assert source.count() == 0
+        assert source.has_more == False
+        assert source.fetch(0, 4) == []
+
+    def test_search_source_reset(self):
+        """Тест перечитывания результатов поиска после reset"""
+        source, calls = self.search_source("книга", batch=4)
+        source.count()
+        source.more()
+        source.count()
+        self.controller.delete_book(self.ids[0])
+
+        # Перечитываются все уже показанные строки с начала
+        source.reset()
+        calls.clear()
+        assert source.count() == 8
+        assert calls == [(8, 0)]
+        assert [book.id for book in source.fetch(0, 8)] == self.ids[1:9]
+
+
+class FakeTree:
+    """Заменяет ttk.Treeview: хранит строки, высота - на четыре ряда"""
+
+    def __init__(self):
+        self.items = {}
+        self.selected = ()
+
+    def get_children(self):
+        return list(self.items)
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.items[iid]
+
+    def insert(self, parent, index, iid, values):
+        self.items[iid] = values
+
+    def item(self, iid, values):
+        self.items[iid] = values
+
+    def bbox(self, iid):
+        return (0, 20, 100, 20)
+
+    def winfo_height(self):
+        return 100
+
+    def selection_set(self, iid):
+        self.selected = (iid,)
+
+    def focus(self, iid):
+        pass
+
+    def selection(self):
+        return self.selected
+
+
+class FakeScrollbar:
+    def set(self, first, last):
+        pass
+
+
+def headless_table(page_size=4, row_key=lambda key: key):
+    """VirtualTreeview с поддельными Treeview и Scrollbar, строки - сами ключи"""
+    table = VirtualTreeview.__new__(VirtualTreeview)
+    table.row_values = lambda record: (row_key(record),)
+    table.row_key = row_key
+    table.page_size = page_size
+    table.loader = None
+    table.on_refresh = None
+    table.source = None
+    table.total = 0
+    table.first = 0
+    table._visible = 1
+    table._pages = OrderedDict()
+    table._window = {}
+    table._selected_key = None
+    table._selected_index = None
+    table._reloading = False
+    table._requested = frozenset()
+    table.tree = FakeTree()
+    table.scrollbar = FakeScrollbar()
+    table.after_idle = lambda callback: None
+    return table
+
+
+class TestVirtualTreeview:
+    """Тесты изменения строк VirtualTreeview без Tk"""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        # Десять строк по четыре на страницу: страницы 0, 1 и 2 (две строки)
+        self.data = list(range(1, 11))
+        self.table = headless_table()
+        self.table.set_source(keyset_over(self.data))
+
+    def load_pages(self, *pages):
+        # Окно остаётся на первой странице, остальные - только в кеше
+        self.table.first = 0
+        self.table._pages.clear()
+        for page in pages:
+            self.table._page(page)
+
+    def assert_pages_match(self):
+        size = self.table.page_size
+        for page, rows in self.table._pages.items():
+            assert rows == self.data[page * size:page * size + size], page
+
+    def assert_matches_data(self):
+        assert self.table.total == len(self.data)
+        self.assert_pages_match()
+        window = self.data[self.table.first:self.table.first + self.table._visible]
+        assert list(self.table.tree.items.values()) == [(key,) for key in window]
+
+    def take(self, key):
+        index = self.data.index(key)
+        self.data.remove(key)
+        assert self.table._take(index) == key
+        self.table.source.removed(index, key)
+        assert self.table.total == len(self.data)
+        self.assert_pages_match()
+
+    def remove(self, key):
+        self.data.remove(key)
+        self.table.remove_row(key)
+        self.assert_matches_data()
+
+    def test_visible_window(self):
+        """Тест отображения только видимых строк"""
+        assert self.table.total == 10
+        assert self.table._visible == 4
+        assert list(self.table.tree.items) == ["1", "2", "3", "4"]
+        self.table.scroll(100)
+        assert self.table.first == 6
+        self.assert_matches_data()
+
+    def test_take_moves_following_pages_up(self):
+        """Тест сдвига закешированных страниц после удаления строки"""
+        self.load_pages(0, 1, 2)
+        # В начале страницы, на границе страниц и в конце данных
+        for key in (2, 5, 10):
+            self.take(key)
+        assert sorted(self.table._pages) == [0, 1, 2]
+        assert self.table._pages[2] == []
+
+    def test_take_drops_pages_after_gap(self):
+        """Тест сброса страниц после незакешированной"""
+        self.load_pages(0, 2)
+        self.take(3)
+        # Последняя строка страницы 0 неизвестна, страница 2 устарела
+        assert not self.table._pages
+
+        # Удаление из последней страницы не трогает предыдущие
+        self.load_pages(0, 2)
+        self.take(10)
+        assert sorted(self.table._pages) == [0, 2]
+
+    def test_take_last_row_of_page(self):
+        """Тест удаления строк, после которых страница пуста"""
+        self.load_pages(0, 1, 2)
+        self.take(10)
+        self.take(9)
+        assert self.table._pages[2] == []
+        self.take(8)
+        assert self.table._pages[1] == [5, 6, 7]
+
+    def test_insert_row(self):
+        """Тест добавления строки в конец таблицы"""
+        self.load_pages(0, 2)
+        self.data.append(11)
+        self.table.insert_row(11)
+        assert self.table._pages[2] == [9, 10, 11]
+        self.assert_matches_data()
+
+        # Последняя страница не загружена: строка не дописывается в кеш
+        self.load_pages(0)
+        self.data.append(12)
+        self.table.insert_row(12)
+        assert sorted(self.table._pages) == [0]
+        self.assert_matches_data()
+
+        # Новая строка открывает следующую страницу
+        self.load_pages(0, 1, 2)
+        self.data.append(13)
+        self.table.insert_row(13)
+        assert 3 not in self.table._pages
+        self.table.scroll(100)
+        self.assert_matches_data()
+
+    def test_remove_row_keeps_selection(self):
+        """Тест сохранения выделения при удалении других строк"""
+        self.table.tree.selection_set("3")
+        self.table._on_select(None)
+        assert (self.table._selected_key, self.table._selected_index) == (3, 2)
+
+        self.remove(1)
+        assert (self.table._selected_key, self.table._selected_index) == (3, 1)
+        self.remove(4)
+        assert (self.table._selected_key, self.table._selected_index) == (3, 1)
+        self.remove(3)
+        assert self.table._selected_key is None
+        assert self.table._selected_index is None
+
+    def test_search_source_replaced(self):
+        """Тест смены поискового запроса в таблице"""
+        def search_source(step):
+            matches = [key for key in self.data if key % step == 0]
+            return SearchSource(lambda limit, offset: matches[offset:offset + limit], batch=4)
+
+        self.table.set_source(search_source(2))
+        assert list(self.table.tree.items) == ["2", "4", "6", "8"]
+        assert self.table.source.has_more == True
+        self.table.scroll(100)
+
+        # Новый запрос начинается с первой строки без страниц старого
+        self.table.set_source(search_source(3))
+        assert self.table.first == 0
+        assert self.table.total == 3
+        assert self.table.source.has_more == False
+        assert list(self.table.tree.items) == ["3", "6", "9"]
+        assert self.table._pages == {0: [3, 6, 9]}
+
+    def test_remove_unknown_row_reloads(self):
+        """Тест перечитывания таблицы при удалении незагруженной строки"""
+        self.load_pages(0)
+        self.data.remove(9)
+        self.table.remove_row(9)
+        assert self.table.total == 9
+        self.table.scroll(100)
+        self.assert_matches_data()
+
+
+class FakeWidget:
+    """Заменяет виджет Tk: after() только запоминает отложенные вызовы"""
+
+    def __init__(self):
+        self.pending = {}
+        self.ids = 0
+
+    def after(self, delay_ms, callback):
+        self.ids += 1
+        self.pending[self.ids] = callback
+        return self.ids
+
+    def after_cancel(self, after_id):
+        del self.pending[after_id]
+
+    def run_pending(self):
+        pending, self.pending = self.pending, {}
+        for callback in pending.values():
+            callback()
+
+
+class TestDebouncer:
+    """Тесты Debouncer без Tk"""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        self.widget = FakeWidget()
+        self.calls = []
+        self.debouncer = Debouncer(self.widget, lambda: self.calls.append(1), delay_ms=10)
+
+    def test_burst_runs_once(self):
+        """Тест того, что серия нажатий запускает один поиск"""
+        for _ in range(5):
+            self.debouncer.schedule()
+        assert len(self.widget.pending) == 1
+        self.widget.run_pending()
+        assert len(self.calls) == 1
+
+        # Следующая серия запускает ещё один
+        self.debouncer.schedule()
+        self.debouncer.schedule()
+        self.widget.run_pending()
+        assert len(self.calls) == 2
+
+    def test_cancel(self):
+        """Тест отмены отложенного вызова"""
+        self.debouncer.schedule()
+        self.debouncer.cancel()
+        assert self.widget.pending == {}
+        self.widget.run_pending()
+        assert self.calls == []
+        # Повторная отмена ничего не делает
+        self.debouncer.cancel()
+
+
+Row = namedtuple("Row", "id")
+
+
+class FakeEntry(FakeWidget):
+    """Заменяет поле ввода: текст задаётся тестом, привязки запоминаются"""
+
+    def __init__(self):
+        super().__init__()
+        self.text = ""
+        self.bindings = {}
+
+    def get(self):
+        return self.text
+
+    def bind(self, sequence, callback):
+        self.bindings[sequence] = callback
+
+
+class FakeButton:
+    def __init__(self):
+        self.options = {}
+
+    def config(self, **options):
+        self.options.update(options)
+
+
+class TestLiveSearch:
+    """Тесты общего поиска по мере ввода для списков книг и читателей"""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        self.data = [Row(key) for key in range(1, 251)]
+        self.searches = []
+        self.table = headless_table(row_key=attrgetter("id"))
+        self.entry = FakeEntry()
+        self.more_button = FakeButton()
+        self.live_search = LiveSearch(
+            self.table, self.entry, self.more_button, self.search,
+            self.list_page, lambda: len(self.data), delay_ms=10
+        )
+        self.live_search.refresh()
+
+    def list_page(self, after_id, limit, offset=0):
+        return [row for row in self.data if row.id > after_id][offset:offset + limit]
+
+    def search(self, query, limit, offset):
+        # Ищет строки, ключ которых делится на число из запроса
+        self.searches.append((query, limit, offset))
+        matches = [row for row in self.data if row.id % int(query) == 0]
+        return matches[offset:offset + limit]
+
+    def type_text(self, text):
+        self.entry.text = text
+        self.entry.bindings["<KeyRelease>"](None)
+
+    def test_typing_searches_once_it_pauses(self):
+        """Тест одного поиска на серию нажатий"""
+        assert isinstance(self.table.source, KeysetSource)
+        assert self.table.total == 250
+        for text in ("1", "10"):
+            self.type_text(text)
+        assert self.searches == []
+        self.entry.run_pending()
+        assert self.searches == [("10", 100, 0)]
+        assert self.table.total == 25
+
+        # Клавиши, не меняющие текст, не запускают поиск
+        self.type_text(" 10 ")
+        self.entry.run_pending()
+        assert len(self.searches) == 1
+
+        # Пустое поле возвращает полный список
+        self.type_text("")
+        self.entry.run_pending()
+        assert isinstance(self.table.source, KeysetSource)
+        assert self.table.total == 250
+
+    def test_return_searches_at_once(self):
+        """Тест поиска по Enter без ожидания паузы"""
+        self.type_text("50")
+        self.entry.bindings["<Return>"](None)
+        assert self.entry.pending == {}
+        assert self.table.total == 5
+
+    def test_load_more(self):
+        """Тест кнопки дочитывания результатов поиска"""
+        assert self.more_button.options["state"] == tk.DISABLED
+
+        self.entry.text = "1"
+        self.live_search.refresh()
+        assert self.table.total == 100
+        assert self.more_button.options["state"] == tk.NORMAL
+
+        load_more = self.more_button.options["command"]
+        load_more()
+        assert self.table.total == 200
+        load_more()
+        assert self.table.total == 250
+        assert self.more_button.options["state"] == tk.DISABLED
+        # Без новых результатов кнопка ничего не читает
+        load_more()
+        assert len(self.searches) == 3
+
+    def test_row_added(self):
+        """Тест добавления строки в полный список и в результаты поиска"""
+        self.data.append(Row(251))
+        self.live_search.row_added(self.data[-1])
+        assert self.table.total == 251
+        assert self.searches == []
+
+        self.type_text("251")
+        self.entry.run_pending()
+        self.data.append(Row(502))
+        self.live_search.row_added(self.data[-1])
+        # Результаты поиска перечитываются запросом
+        assert self.table.total == 2
+        assert self.searches[-1] == ("251", 100, 0)
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -2,12 +2,21 @@ import pytest
 import sys
 import os
 import tempfile
+import sqlite3
+import asyncio
+import threading
+import time
 from datetime import datetime, timedelta
 
 # Добавляем путь к модулям проекта
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
+import database.database_manager as database_manager
 from database.database_manager import DatabaseManager
+from database.cache import CachingDatabaseManager, LRUCache, PooledCachingDatabaseManager
+from database.pool import PooledDatabaseManager
+from database.writer import GroupCommitWriter
+from database.async_manager import AsyncDatabaseManager
 from models.book import Book
 from models.reader import Reader
 from models.loan import Loan
@@ -50,6 +59,93 @@ class TestDatabaseManager:
         )
         assert cursor.fetchone() is not None
 
+    def test_loan_indexes_created(self):
+        """Тест создания вторичных индексов для выдач"""
+        cursor = self.db_manager.conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
+        indexes = {row[0] for row in cursor.fetchall()}
+
+        assert "idx_loans_reader_id" in indexes
+        assert "idx_loans_book_id" in indexes
+        assert "idx_loans_open_return_date" in indexes
+        assert "idx_loans_is_returned" in indexes
+        assert "idx_books_available" in indexes
+
+    def test_read_methods_use_indexes(self):
+        """Тест планов запросов всех методов чтения"""
+        # Методы, которым разрешено полное сканирование таблицы
+        full_scan_allowed = {
+            "get_all_books", "get_all_readers", "get_all_loans", "count_books", "count_readers"
+        }
+        # Индекс, который должен обслуживать фильтр по статусу
+        status_index = "idx_loans_is_returned"
+        expected_indexes = {
+            "get_loans": status_index,
+            "list_loan_details": status_index,
+            "count_loans": status_index,
+        }
+        read_calls = {
+            "get_book_by_id": (1,),
+            "get_book_by_isbn": ("123-456",),
+            "get_all_books": (),
+            "search_books": ("мир",),
+            "search_available_books": ("мир",),
+            "get_reader_by_id": (1,),
+            "get_reader_by_email": ("reader@example.com",),
+            "get_readers_by_phone": ("+7-999-123-45-67",),
+            "search_readers": ("иван",),
+            "get_all_readers": (),
+            "get_loan_by_id": (1,),
+            "get_all_loans": (),
+            "get_reader_loans": (1,),
+            "get_overdue_loans": (),
+            "list_books": (0, 10),
+            "iter_books": (10,),
+            "list_readers": (0, 10),
+            "iter_readers": (10,),
+            "list_loans": (0, 10),
+            "get_loans": ("overdue",),
+            "list_loan_details": ("active",),
+            "count_books": (),
+            "count_readers": (),
+            "count_loans": ("returned",),
+            "get_loan_details": (1,),
+            "iter_loan_details": (10,),
+            "iter_loans": (10,),
+        }
+        # Каждый новый метод чтения должен попасть в эту проверку
+        read_methods = {
+            name for name in dir(self.db_manager)
+            if name.startswith(("get_", "search_", "list_", "iter_", "count_"))
+        }
+        assert read_methods == set(read_calls)
+
+        for name, args in read_calls.items():
+            with self.db_manager.capture_query_plans() as plans:
+                result = getattr(self.db_manager, name)(*args)
+                if hasattr(result, "__next__"):
+                    list(result)
+            assert plans, name
+            if name in expected_indexes:
+                details = [d for plan in plans.values() for d in plan]
+                assert any(expected_indexes[name] in d for d in details), f"{name} -> {details}"
+            if name in full_scan_allowed:
+                continue
+            for sql, details in plans.items():
+                scans = [
+                    d for d in details
+                    if d.startswith("SCAN") and "VIRTUAL TABLE" not in d
+                ]
+                assert not scans, f"{name}: {sql} -> {details}"
+
+    def test_available_books_use_partial_index(self):
+        """Тест плана выбора доступных книг без текста"""
+        with self.db_manager.capture_query_plans() as plans:
+            self.db_manager.search_available_books("")
+        details = [d for plan in plans.values() for d in plan]
+        # Частичный индекс обходит только книги с доступными экземплярами
+        assert any("idx_books_available" in d for d in details), details
+
     def test_add_book(self):
         """Тест добавления книги в базу данных"""
         book = Book("Война и мир", "Лев Толстой", "978-5-389-12345-6", 1869, 5)
@@ -140,6 +236,209 @@ class TestDatabaseManager:
         results = self.db_manager.search_books("Толстой")
         assert len(results) >= 1
 
+    def test_decrement_available(self):
+        """Тест атомарного уменьшения числа доступных экземпляров"""
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 1))
+
+        assert self.db_manager.decrement_available(book_id) == True
+        # Последний экземпляр уже выдан
+        assert self.db_manager.decrement_available(book_id) == False
+        assert self.db_manager.get_book_by_id(book_id).available == 0
+
+        # Несуществующая книга
+        assert self.db_manager.decrement_available(9999) == False
+
+    def test_increment_available(self):
+        """Тест атомарного увеличения числа доступных экземпляров"""
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 2))
+
+        # Нельзя вернуть больше экземпляров, чем есть в фонде
+        assert self.db_manager.increment_available(book_id) == False
+
+        self.db_manager.decrement_available(book_id)
+        assert self.db_manager.increment_available(book_id) == True
+        assert self.db_manager.get_book_by_id(book_id).available == 2
+
+    def test_list_books_keyset_pages(self):
+        """Тест постраничного чтения книг по ключу"""
+        book_ids = self.db_manager.add_books_many(
+            Book(f"Книга {i}", "Автор", f"isbn-{i}", 2020, 1) for i in range(5)
+        )
+
+        first_page = self.db_manager.list_books(limit=2)
+        assert [book.id for book in first_page] == book_ids[:2]
+
+        next_page = self.db_manager.list_books(after_id=first_page[-1].id, limit=2)
+        assert [book.id for book in next_page] == book_ids[2:4]
+
+        last_page = self.db_manager.list_books(after_id=book_ids[-1], limit=2)
+        assert last_page == []
+
+    def test_count_and_offset_pages(self):
+        """Тест подсчета строк и смещения внутри страницы"""
+        book_ids = self.db_manager.add_books_many(
+            Book(f"Книга {i}", "Автор", f"isbn-{i}", 2020, 1) for i in range(6)
+        )
+        reader_id = self.db_manager.add_reader(
+            Reader("Читатель", "r@example.com", "+7-999-111-11-11")
+        )
+        loan_date = datetime.now()
+        self.db_manager.add_loan(Loan(book_ids[0], reader_id, loan_date,
+                                      loan_date - timedelta(days=1)))
+
+        assert self.db_manager.count_books() == 6
+        assert self.db_manager.count_readers() == 1
+        assert self.db_manager.count_loans() == 1
+        assert self.db_manager.count_loans(status="overdue") == 1
+        assert self.db_manager.count_loans(status="returned") == 0
+
+        page = self.db_manager.list_books(after_id=book_ids[0], limit=2, offset=2)
+        assert [book.id for book in page] == book_ids[3:5]
+        details = self.db_manager.list_loan_details(offset=1)
+        assert details == []
+
+    def test_iter_books_streams_all_rows(self):
+        """Тест потокового обхода всех книг"""
+        book_ids = self.db_manager.add_books_many(
+            Book(f"Книга {i}", "Автор", f"isbn-{i}", 2020, 1) for i in range(7)
+        )
+
+        books = self.db_manager.iter_books(batch_size=3)
+        assert not isinstance(books, list)
+        assert [book.id for book in books] == book_ids
+
+    def test_get_all_books_columnar(self):
+        """Тест колоночного представления списка книг"""
+        book_ids = self.db_manager.add_books_many(
+            Book(f"Книга {i}", "Автор", f"isbn-{i}", 2000 + i, 2) for i in range(5)
+        )
+
+        table = self.db_manager.get_all_books(columnar=True)
+        assert len(table) == 5
+        assert list(table.ids) == book_ids
+        assert list(table.years) == [2000, 2001, 2002, 2003, 2004]
+        # Повторяющиеся строки хранятся в одном экземпляре
+        assert table.authors[0] is table.authors[4]
+
+        # Строки материализуются в модели только при обращении
+        book = table[2]
+        assert isinstance(book, Book)
+        assert book.to_dict() == self.db_manager.get_book_by_id(book_ids[2]).to_dict()
+        assert [b.title for b in table[-2:]] == ["Книга 3", "Книга 4"]
+
+    def test_iter_columnar_pages(self):
+        """Тест постраничного обхода в колоночном виде"""
+        book_ids = self.db_manager.add_books_many(
+            Book(f"Книга {i}", "Автор", f"isbn-{i}", 2020, 1) for i in range(5)
+        )
+        reader_id = self.db_manager.add_reader(
+            Reader("Читатель", "r@example.com", "+7-999-111-11-11")
+        )
+        loan_date = datetime(2024, 3, 1, 12, 30, 0)
+        self.db_manager.add_loan(Loan(book_ids[0], reader_id, loan_date,
+                                      loan_date + timedelta(days=14)))
+
+        pages = list(self.db_manager.iter_books(batch_size=2, columnar=True))
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert [book.id for page in pages for book in page] == book_ids
+
+        readers = self.db_manager.get_all_readers(columnar=True)
+        assert readers[0].registration_date == self.db_manager.get_reader_by_id(
+            reader_id).registration_date
+
+        loans = next(self.db_manager.iter_loans(columnar=True))
+        assert loans[0].loan_date == loan_date
+        assert loans[0].is_returned == False
+
+    def test_search_books_prefix_and_ranking(self):
+        """Тест полнотекстового поиска по префиксу с ранжированием"""
+        self.db_manager.add_book(Book("Записки", "Мирон Автор", "123-1", 2020, 1))
+        self.db_manager.add_book(Book("Война и мир", "Лев Толстой", "123-2", 1869, 1))
+        self.db_manager.add_book(Book("Анна Каренина", "Лев Толстой", "123-3", 1877, 1))
+
+        # Префикс слова, без учета регистра
+        results = self.db_manager.search_books("толст")
+        assert {book.title for book in results} == {"Война и мир", "Анна Каренина"}
+
+        # Совпадение в названии важнее совпадения в авторе
+        results = self.db_manager.search_books("мир")
+        assert [book.title for book in results] == ["Война и мир", "Записки"]
+
+        # Все слова запроса должны совпасть
+        results = self.db_manager.search_books("лев анна")
+        assert [book.title for book in results] == ["Анна Каренина"]
+
+        # Ограничение и смещение
+        assert len(self.db_manager.search_books("лев", limit=1)) == 1
+        assert len(self.db_manager.search_books("лев", limit=1, offset=1)) == 1
+
+        # Спецсимволы FTS5 не ломают запрос
+        assert len(self.db_manager.search_books('мир" * (')) == 2
+        assert self.db_manager.search_books("  ") == []
+
+    def test_search_books_exact_isbn(self):
+        """Тест точного поиска книги по ISBN"""
+        book_id = self.db_manager.add_book(
+            Book("Война и мир", "Лев Толстой", "978-5-389-12345-6", 1869, 1)
+        )
+
+        results = self.db_manager.search_books("978-5-389-12345-6")
+        assert [book.id for book in results] == [book_id]
+        assert self.db_manager.get_book_by_isbn(" 978-5-389-12345-6 ").id == book_id
+
+    def test_search_available_books(self):
+        """Тест подбора доступных книг по префиксу ISBN и названия"""
+        war = self.db_manager.add_book(Book("Война и мир", "Лев Толстой", "978-5-1", 1869, 1))
+        anna = self.db_manager.add_book(Book("Анна Каренина", "Лев Толстой", "978-5-2", 1877, 1))
+        peace = self.db_manager.add_book(Book("Мирный атом", "Автор", "979-1", 1960, 1))
+        self.db_manager.decrement_available(anna)
+
+        # Префикс ISBN, выданные книги не предлагаются
+        results = self.db_manager.search_available_books("978-5")
+        assert [book.id for book in results] == [war]
+
+        # Префикс слова названия, но не автора
+        results = self.db_manager.search_available_books("мир")
+        assert {book.id for book in results} == {war, peace}
+        assert self.db_manager.search_available_books("толст") == []
+
+        # Без текста - первые доступные книги, с ограничением
+        results = self.db_manager.search_available_books("", limit=1)
+        assert [book.id for book in results] == [war]
+
+    def test_search_index_follows_updates_and_deletes(self):
+        """Тест синхронизации поискового индекса с изменениями книг"""
+        book_id = self.db_manager.add_book(Book("Старое название", "Автор", "123-1", 2020, 1))
+
+        self.db_manager.update_book(book_id, title="Новое название")
+        assert self.db_manager.search_books("старое") == []
+        assert [book.id for book in self.db_manager.search_books("новое")] == [book_id]
+
+        self.db_manager.delete_book(book_id)
+        assert self.db_manager.search_books("новое") == []
+
+    def test_search_index_built_for_existing_database(self):
+        """Тест построения поискового индекса для уже заполненной базы"""
+        self.db_manager.close()
+        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        conn = sqlite3.connect(temp_db.name)
+        conn.execute("""
+            CREATE TABLE books (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL,
+                author TEXT NOT NULL, isbn TEXT NOT NULL UNIQUE, year INTEGER NOT NULL,
+                quantity INTEGER NOT NULL, available INTEGER NOT NULL
+            )
+        """)
+        conn.execute(
+            "INSERT INTO books (title, author, isbn, year, quantity, available) "
+            "VALUES ('Война и мир', 'Лев Толстой', '123-1', 1869, 1, 1)"
+        )
+        conn.commit()
+        conn.close()
+
+        self.db_manager = DatabaseManager(temp_db.name)
+        assert [book.title for book in self.db_manager.search_books("война")] == ["Война и мир"]
+
     def test_add_reader(self):
         """Тест добавления читателя в базу данных"""
         reader = Reader("Иван Иванов", "ivan@example.com", "+7-999-123-45-67")
@@ -210,6 +509,69 @@ class TestDatabaseManager:
         deleted_reader = self.db_manager.get_reader_by_id(reader_id)
         assert deleted_reader is None
 
+    def test_iter_readers_and_loans(self):
+        """Тест потокового обхода читателей и выдач"""
+        reader_ids = self.db_manager.add_readers_many(
+            Reader(f"Читатель {i}", f"r{i}@example.com", "+7-999-111-11-11")
+            for i in range(4)
+        )
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 5))
+        loan_date = datetime.now()
+        loan_ids = self.db_manager.add_loans_many(
+            Loan(book_id, reader_id, loan_date, loan_date + timedelta(days=14))
+            for reader_id in reader_ids
+        )
+
+        assert [r.id for r in self.db_manager.iter_readers(batch_size=2)] == reader_ids
+        assert [loan.id for loan in self.db_manager.iter_loans(batch_size=4)] == loan_ids
+        assert len(self.db_manager.list_loans(after_id=loan_ids[1])) == 2
+
+    def test_search_readers(self):
+        """Тест поиска читателей по имени, email и телефону"""
+        ivan_id = self.db_manager.add_reader(
+            Reader("Иван Иванов", "ivan@example.com", "+7-999-123-45-67")
+        )
+        petr_id = self.db_manager.add_reader(
+            Reader("Петр Иванов", "petr@mail.org", "+7-999-765-43-21")
+        )
+
+        # Префикс имени без учета регистра
+        results = self.db_manager.search_readers("иван")
+        assert {reader.id for reader in results} == {ivan_id, petr_id}
+
+        # Часть email и часть телефона
+        assert [r.id for r in self.db_manager.search_readers("mail")] == [petr_id]
+        assert [r.id for r in self.db_manager.search_readers("765")] == [petr_id]
+
+        # Ограничение и смещение
+        assert len(self.db_manager.search_readers("иванов", limit=1)) == 1
+        assert len(self.db_manager.search_readers("иванов", limit=1, offset=1)) == 1
+        assert self.db_manager.search_readers("иванов", offset=2) == []
+
+    def test_search_readers_exact_email_and_phone(self):
+        """Тест точного поиска читателя по email и телефону"""
+        reader_id = self.db_manager.add_reader(
+            Reader("Иван Иванов", "ivan@example.com", "+7-999-123-45-67")
+        )
+
+        assert [r.id for r in self.db_manager.search_readers("ivan@example.com")] == [reader_id]
+        assert [r.id for r in self.db_manager.search_readers("+7-999-123-45-67")] == [reader_id]
+        assert self.db_manager.get_reader_by_email("nobody@example.com") is None
+        assert self.db_manager.get_readers_by_phone("+7-000") == []
+
+    def test_reader_search_index_follows_updates(self):
+        """Тест синхронизации поискового индекса читателей"""
+        reader_id = self.db_manager.add_reader(
+            Reader("Старое имя", "old@example.com", "+7-999-123-45-67")
+        )
+
+        self.db_manager.update_reader(reader_id, name="Новое имя")
+        assert self.db_manager.search_readers("старое") == []
+        assert [r.id for r in self.db_manager.search_readers("новое")] == [reader_id]
+
+        self.db_manager.delete_reader(reader_id)
+        assert self.db_manager.search_readers("новое") == []
+
     def test_add_loan(self):
         """Тест добавления выдачи в базу данных"""
         # Создаем книгу и читателя
@@ -302,6 +664,24 @@ class TestDatabaseManager:
         updated_loan = self.db_manager.get_loan_by_id(loan_id)
         assert updated_loan.is_returned == True
 
+    def test_mark_loan_returned(self):
+        """Тест отметки возврата одной командой"""
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 1))
+        reader_id = self.db_manager.add_reader(
+            Reader("Читатель", "reader@example.com", "+7-999-123-45-67")
+        )
+        loan_date = datetime.now()
+        loan_id = self.db_manager.add_loan(
+            Loan(book_id, reader_id, loan_date, loan_date + timedelta(days=14))
+        )
+
+        assert self.db_manager.mark_loan_returned(loan_id) == book_id
+        assert self.db_manager.get_loan_by_id(loan_id).is_returned == True
+
+        # Повторный возврат и несуществующая выдача
+        assert self.db_manager.mark_loan_returned(loan_id) is None
+        assert self.db_manager.mark_loan_returned(9999) is None
+
     def test_get_reader_loans(self):
         """Тест получения выдачи конкретного читателя"""
         # Создаем книгу и читателя
@@ -349,6 +729,253 @@ class TestDatabaseManager:
         for loan in overdue_loans:
             assert loan.is_overdue() == True
 
+    def test_add_books_many(self):
+        """Тест пакетного добавления книг из генератора"""
+        books = (
+            Book(f"Книга {i}", "Автор", f"isbn-{i}", 2020, 2) for i in range(7)
+        )
+
+        book_ids = self.db_manager.add_books_many(books, chunk_size=3)
+        assert len(book_ids) == 7
+        assert len(set(book_ids)) == 7
+
+        for i, book_id in enumerate(book_ids):
+            saved_book = self.db_manager.get_book_by_id(book_id)
+            assert saved_book.title == f"Книга {i}"
+            assert saved_book.available == 2
+
+    def test_add_books_many_rolls_back_failed_chunk(self):
+        """Тест отката неудачной пачки при пакетном добавлении"""
+        books = [
+            Book("Книга 1", "Автор", "isbn-1", 2020, 1),
+            Book("Книга 2", "Автор", "isbn-2", 2020, 1),
+            Book("Книга 3", "Автор", "isbn-3", 2020, 1),
+            Book("Дубликат", "Автор", "isbn-3", 2020, 1),
+        ]
+
+        with pytest.raises(sqlite3.IntegrityError):
+            self.db_manager.add_books_many(books, chunk_size=2)
+
+        # Первая пачка зафиксирована, вторая откатена целиком
+        titles = [book.title for book in self.db_manager.get_all_books()]
+        assert titles == ["Книга 1", "Книга 2"]
+
+    def test_add_readers_many(self):
+        """Тест пакетного добавления читателей"""
+        readers = [
+            Reader(f"Читатель {i}", f"reader{i}@example.com", "+7-999-111-11-11")
+            for i in range(5)
+        ]
+
+        reader_ids = self.db_manager.add_readers_many(readers, chunk_size=2)
+        assert reader_ids == [reader.id for reader in readers]
+        assert self.db_manager.get_reader_by_id(reader_ids[-1]).name == "Читатель 4"
+
+    def test_add_loans_many(self):
+        """Тест пакетного добавления выдач"""
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 3))
+        reader_id = self.db_manager.add_reader(
+            Reader("Читатель", "reader@example.com", "+7-999-123-45-67")
+        )
+        loan_date = datetime.now()
+        return_date = loan_date + timedelta(days=14)
+
+        loan_ids = self.db_manager.add_loans_many(
+            Loan(book_id, reader_id, loan_date, return_date) for _ in range(3)
+        )
+        assert len(loan_ids) == 3
+        assert len(self.db_manager.get_reader_loans(reader_id)) == 3
+
+    def test_transaction_commits_once_on_exit(self):
+        """Тест отложенной фиксации изменений внутри транзакции"""
+        other = sqlite3.connect(self.temp_db.name)
+        try:
+            with self.db_manager.transaction():
+                self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 1))
+                self.db_manager.add_reader(
+                    Reader("Читатель", "reader@example.com", "+7-999-123-45-67")
+                )
+                # Другое соединение не видит незафиксированных данных
+                assert other.execute("SELECT COUNT(*) FROM books").fetchone()[0] == 0
+
+            assert other.execute("SELECT COUNT(*) FROM books").fetchone()[0] == 1
+            assert other.execute("SELECT COUNT(*) FROM readers").fetchone()[0] == 1
+        finally:
+            other.close()
+
+    def test_transaction_rollback_on_error(self):
+        """Тест отката всех изменений транзакции при ошибке"""
+        with pytest.raises(RuntimeError):
+            with self.db_manager.transaction():
+                book_id = self.db_manager.add_book(
+                    Book("Книга", "Автор", "123-456", 2020, 1)
+                )
+                self.db_manager.update_book(book_id, available=0)
+                raise RuntimeError("сбой")
+
+        assert self.db_manager.get_all_books() == []
+
+    def test_nested_savepoint_rollback(self):
+        """Тест отката вложенной точки сохранения без отката внешней транзакции"""
+        with self.db_manager.transaction():
+            self.db_manager.add_book(Book("Книга 1", "Автор", "123-1", 2020, 1))
+            with pytest.raises(sqlite3.IntegrityError):
+                with self.db_manager.savepoint():
+                    self.db_manager.add_book(Book("Книга 2", "Автор", "123-2", 2020, 1))
+                    self.db_manager.add_book(Book("Дубликат", "Автор", "123-2", 2020, 1))
+
+        titles = [book.title for book in self.db_manager.get_all_books()]
+        assert titles == ["Книга 1"]
+
+    def test_get_loans_filters(self):
+        """Тест фильтрации выдач по статусу, читателю, книге и сроку"""
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 5))
+        other_book_id = self.db_manager.add_book(Book("Книга 2", "Автор", "123-457", 2020, 5))
+        reader_id = self.db_manager.add_reader(
+            Reader("Читатель", "reader@example.com", "+7-999-123-45-67")
+        )
+        other_reader_id = self.db_manager.add_reader(
+            Reader("Читатель 2", "reader2@example.com", "+7-999-123-45-68")
+        )
+        now = datetime.now()
+        active = Loan(book_id, reader_id, now, now + timedelta(days=14))
+        overdue = Loan(book_id, other_reader_id, now - timedelta(days=20), now - timedelta(days=6))
+        returned = Loan(other_book_id, reader_id, now, now + timedelta(days=14))
+        self.db_manager.add_loans_many([active, overdue, returned])
+        self.db_manager.mark_loan_returned(returned.id)
+
+        def ids(**kwargs):
+            return [loan.id for loan in self.db_manager.get_loans(**kwargs)]
+
+        assert ids() == [active.id, overdue.id, returned.id]
+        assert ids(status="active") == [active.id, overdue.id]
+        assert ids(status="overdue") == [overdue.id]
+        assert ids(status="returned") == [returned.id]
+        assert ids(reader_id=reader_id) == [active.id, returned.id]
+        assert ids(book_id=book_id, status="active") == [active.id, overdue.id]
+        assert ids(due_before=now) == [overdue.id]
+        assert ids(limit=1, after_id=active.id) == [overdue.id]
+
+        with pytest.raises(ValueError):
+            self.db_manager.get_loans(status="lost")
+
+    def test_list_loan_details(self):
+        """Тест получения выдач вместе с книгой и читателем одним запросом"""
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 2))
+        reader_id = self.db_manager.add_reader(
+            Reader("Читатель", "reader@example.com", "+7-999-123-45-67")
+        )
+        loan_date = datetime.now()
+        loan_ids = self.db_manager.add_loans_many(
+            Loan(book_id, reader_id, loan_date, loan_date + timedelta(days=14))
+            for _ in range(3)
+        )
+        self.db_manager.mark_loan_returned(loan_ids[0])
+
+        with self.db_manager.capture_query_plans() as plans:
+            details = self.db_manager.list_loan_details(status="active")
+        assert len(plans) == 1
+        assert [d["id"] for d in details] == loan_ids[1:]
+        assert details[0]["book_title"] == "Книга"
+        assert details[0]["book_isbn"] == "123-456"
+        assert details[0]["reader_name"] == "Читатель"
+        assert details[0]["reader_email"] == "reader@example.com"
+        assert details[0]["is_returned"] == False
+        assert self.db_manager.get_loan_details(loan_ids[1]) == details[0]
+        assert self.db_manager.get_loan_details(999) is None
+
+        # Выдача удаленной книги остается в списке
+        self.db_manager.delete_book(book_id)
+        details = list(self.db_manager.iter_loan_details(batch_size=2, reader_id=reader_id))
+        assert [d["id"] for d in details] == loan_ids
+        assert details[0]["book_title"] is None
+
+    def test_dates_stored_as_epoch_seconds(self):
+        """Тест хранения дат целыми числами секунд"""
+        reader_id = self.db_manager.add_reader(
+            Reader("Читатель", "reader@example.com", "+7-999-123-45-67")
+        )
+        loan_date = datetime(2024, 3, 1, 12, 30, 15)
+        loan_id = self.db_manager.add_loan(
+            Loan(1, reader_id, loan_date, loan_date + timedelta(days=14))
+        )
+
+        cursor = self.db_manager.conn.cursor()
+        cursor.execute("SELECT loan_date, typeof(return_date) FROM loans")
+        assert cursor.fetchone() == (1709296215, "integer")
+        cursor.execute("SELECT typeof(registration_date) FROM readers")
+        assert cursor.fetchone() == ("integer",)
+        cursor.execute("PRAGMA user_version")
+        assert cursor.fetchone()[0] == database_manager.SCHEMA_VERSION
+
+        saved_loan = self.db_manager.get_loan_by_id(loan_id)
+        assert saved_loan.loan_date == loan_date
+        assert saved_loan.return_date == datetime(2024, 3, 15, 12, 30, 15)
+
+    def test_migrate_text_dates_to_epoch(self, monkeypatch):
+        """Тест пакетной миграции базы с датами в текстовом формате"""
+        monkeypatch.setattr(database_manager, "MIGRATION_BATCH_SIZE", 2)
+        self.db_manager.close()
+        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        conn = sqlite3.connect(temp_db.name)
+        conn.executescript("""
+            CREATE TABLE readers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                email TEXT NOT NULL UNIQUE, phone TEXT NOT NULL,
+                registration_date TEXT NOT NULL
+            );
+            CREATE TABLE loans (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, book_id INTEGER NOT NULL,
+                reader_id INTEGER NOT NULL, loan_date TEXT NOT NULL,
+                return_date TEXT NOT NULL, is_returned INTEGER NOT NULL
+            );
+            INSERT INTO readers VALUES
+                (1, 'Иван', 'ivan@example.com', '+7-1', '2024-01-05 10:00:00');
+            INSERT INTO loans VALUES
+                (1, 1, 1, '2024-01-10 09:00:00', '2024-01-24 09:00:00', 1),
+                (2, 1, 1, '2024-02-01 09:00:00', '2024-02-15 09:00:00', 0),
+                (3, 1, 1, '2024-03-01 09:00:00', '2099-03-15 09:00:00', 0),
+                (4, 1, 1, '2024-04-01 09:00:00', '2099-04-15 09:00:00', 0);
+            DELETE FROM loans WHERE id = 4;
+        """)
+        conn.close()
+
+        self.db_manager = DatabaseManager(temp_db.name)
+
+        reader = self.db_manager.get_reader_by_id(1)
+        assert reader.registration_date == datetime(2024, 1, 5, 10, 0, 0)
+        assert [r.id for r in self.db_manager.search_readers("иван")] == [1]
+
+        loans = self.db_manager.get_all_loans()
+        assert [loan.id for loan in loans] == [1, 2, 3]
+        assert loans[0].loan_date == datetime(2024, 1, 10, 9, 0, 0)
+        assert loans[0].is_returned == True
+        assert [loan.id for loan in self.db_manager.get_overdue_loans()] == [2]
+
+        # Индексы пересозданы, идентификаторы удаленных строк не переиспользуются
+        assert self.db_manager.explain_query_plan(
+            "SELECT * FROM loans WHERE reader_id = 1"
+        ) == ["SEARCH loans USING INDEX idx_loans_reader_id (reader_id=?)"]
+        new_loan_id = self.db_manager.add_loan(
+            Loan(1, 1, datetime.now(), datetime.now() + timedelta(days=14))
+        )
+        assert new_loan_id == 5
+
+    def test_reads_skip_model_validation(self, monkeypatch):
+        """Тест чтения сохраненных данных без повторной валидации моделей"""
+        self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 1))
+        self.db_manager.add_reader(Reader("Читатель", "reader@example.com", "+7-1"))
+
+        def fail(*args, **kwargs):
+            raise AssertionError("validation must not run on read")
+
+        monkeypatch.setattr(Book, "__init__", fail)
+        monkeypatch.setattr(Reader, "_is_valid_email", fail)
+
+        assert self.db_manager.get_all_books()[0].title == "Книга"
+        assert self.db_manager.get_all_readers()[0].email == "reader@example.com"
+        assert self.db_manager.search_readers("читатель")[0].name == "Читатель"
+
     def test_data_integrity(self):
         """Тест целостности данных"""
         # Создаем книгу и читателя
@@ -376,5 +1003,426 @@ class TestDatabaseManager:
         assert retrieved_reader.id == reader_id
 
 
+class TestLRUCache:
+    """Тесты для LRUCache"""
+
+    def test_lru_eviction(self):
+        """Тест вытеснения давно не использованных записей"""
+        cache = LRUCache(maxsize=2)
+        cache.put(1, "a")
+        cache.put(2, "b")
+        cache.get(1)
+        cache.put(3, "c")
+
+        assert cache.get(2, None) is None
+        assert cache.get(1) == "a"
+        assert cache.get(3) == "c"
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Тест устаревания записей по времени"""
+        now = [100.0]
+        cache = LRUCache(maxsize=10, ttl=5, clock=lambda: now[0])
+        cache.put("key", "value")
+
+        now[0] = 104.0
+        assert cache.get("key") == "value"
+        now[0] = 106.0
+        assert cache.get("key", None) is None
+        assert len(cache) == 0
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_weight_budget(self):
+        """Тест ограничения кэша по суммарному весу записей"""
+        cache = LRUCache(maxsize=10)
+        cache.put("a", [1] * 6, weight=6)
+        cache.put("b", [2] * 3, weight=3)
+        cache.put("c", [3] * 4, weight=4)
+
+        assert cache.get("a", None) is None
+        assert cache.weight == 7
+        # Запись тяжелее всего бюджета не кэшируется
+        cache.put("d", [4] * 11, weight=11)
+        assert cache.get("d", None) is None
+
+
+class TestCachingDatabaseManager:
+    """Тесты для CachingDatabaseManager"""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        self.db_manager = CachingDatabaseManager(self.temp_db.name, maxsize=10)
+
+    def teardown_method(self):
+        self.db_manager.close()
+
+    def test_book_lookup_is_cached(self):
+        """Тест повторного чтения книги из кэша"""
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 2))
+
+        first = self.db_manager.get_book_by_id(book_id)
+        second = self.db_manager.get_book_by_id(book_id)
+        assert second.to_dict() == first.to_dict()
+        assert self.db_manager.cache_stats()["books"]["hits"] == 1
+
+        # Изменение возвращенного объекта не портит кэш
+        second.available = 0
+        assert self.db_manager.get_book_by_id(book_id).available == 2
+
+    def test_writes_invalidate_cache(self):
+        """Тест сброса кэша при изменении данных"""
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 2))
+        reader_id = self.db_manager.add_reader(
+            Reader("Читатель", "reader@example.com", "+7-999-123-45-67")
+        )
+        self.db_manager.get_book_by_id(book_id)
+        self.db_manager.get_reader_by_id(reader_id)
+
+        self.db_manager.decrement_available(book_id)
+        assert self.db_manager.get_book_by_id(book_id).available == 1
+        self.db_manager.increment_available(book_id)
+        assert self.db_manager.get_book_by_id(book_id).available == 2
+        self.db_manager.update_book(book_id, title="Новая")
+        assert self.db_manager.get_book_by_id(book_id).title == "Новая"
+        self.db_manager.update_reader(reader_id, name="Иван")
+        assert self.db_manager.get_reader_by_id(reader_id).name == "Иван"
+
+        self.db_manager.delete_book(book_id)
+        self.db_manager.delete_reader(reader_id)
+        assert self.db_manager.get_book_by_id(book_id) is None
+        assert self.db_manager.get_reader_by_id(reader_id) is None
+
+    def test_search_results_are_cached(self):
+        """Тест кэширования результатов поиска по запросу без крайних пробелов"""
+        self.db_manager.add_book(Book("Гарри Поттер", "Дж. Роулинг", "123-1", 1997, 2))
+
+        first = self.db_manager.search_books("гарри поттер")
+        second = self.db_manager.search_books("  гарри поттер ")
+        assert [book.id for book in second] == [book.id for book in first]
+        stats = self.db_manager.cache_stats()["searches"]
+        assert stats["hits"] == 1
+        assert stats["weight"] == 1
+
+        # Другие параметры страницы - другая запись
+        assert self.db_manager.search_books("гарри поттер", offset=1) == []
+        assert self.db_manager.cache_stats()["searches"]["misses"] == 2
+
+    def test_search_cache_keeps_isbn_case(self):
+        """Тест того, что запросы, различающиеся регистром ISBN, не смешиваются"""
+        self.db_manager.add_book(Book("Книга", "Автор", "012345678X", 2020, 1))
+
+        assert len(self.db_manager.search_books("012345678X")) == 1
+        # Поиск по ISBN точный: без кэша такой запрос ничего не находит
+        assert self.db_manager.search_books("012345678x") == []
+        assert self.db_manager.cache_stats()["searches"]["hits"] == 0
+
+    def test_book_writes_invalidate_search_cache(self):
+        """Тест сброса кэша поиска при любой записи в таблицу книг"""
+        book_id = self.db_manager.add_book(Book("Гарри Поттер", "Роулинг", "123-1", 1997, 2))
+        self.db_manager.search_books("поттер")
+
+        self.db_manager.decrement_available(book_id)
+        assert self.db_manager.search_books("поттер")[0].available == 1
+
+        self.db_manager.add_book(Book("Гарри Поттер 2", "Роулинг", "123-2", 1998, 1))
+        assert len(self.db_manager.search_books("поттер")) == 2
+        assert self.db_manager.cache_stats()["searches"]["hits"] == 0
+
+    def test_rolled_back_reads_are_not_cached(self):
+        """Тест того, что чтение внутри отмененной транзакции не попадает в кэш"""
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 2))
+
+        with pytest.raises(RuntimeError):
+            with self.db_manager.transaction():
+                self.db_manager.decrement_available(book_id)
+                assert self.db_manager.get_book_by_id(book_id).available == 1
+                raise RuntimeError("отмена")
+
+        assert self.db_manager.get_book_by_id(book_id).available == 2
+
+    def test_read_racing_write_is_not_cached(self):
+        """Тест того, что строка, измененная во время чтения, не попадает в кэш"""
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 2))
+
+        def load(key):
+            book = DatabaseManager.get_book_by_id(self.db_manager, key)
+            # Запись из другого потока между чтением и сохранением в кэш
+            self.db_manager.update_book(key, title="Новая")
+            return book
+
+        stale = self.db_manager._cached(self.db_manager.book_cache, "books", book_id, load)
+        assert stale.title == "Книга"
+        assert self.db_manager.get_book_by_id(book_id).title == "Новая"
+
+
+class TestPooledCachingDatabaseManager:
+    """Тесты для PooledCachingDatabaseManager"""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        self.db_manager = PooledCachingDatabaseManager(self.temp_db.name)
+
+    def teardown_method(self):
+        self.db_manager.close()
+
+    def test_worker_reads_share_cache(self):
+        """Тест чтения из рабочего потока через свое соединение и общий кэш"""
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 2))
+        seen = []
+
+        def worker():
+            seen.append((self.db_manager.conn, self.db_manager.get_book_by_id(book_id).title))
+            self.db_manager.release()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert seen[0][0] is not self.db_manager.conn
+        assert seen[0][1] == "Книга"
+        assert self.db_manager.get_book_by_id(book_id).title == "Книга"
+        assert self.db_manager.cache_stats()["books"]["hits"] == 1
+
+    def test_read_during_open_transaction_is_not_cached(self):
+        """Тест чтения из другого потока во время незавершенной транзакции"""
+        book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 1))
+        self.db_manager.search_books("книга")
+        written = threading.Event()
+        read_done = threading.Event()
+
+        def writer():
+            with self.db_manager.transaction():
+                self.db_manager.decrement_available(book_id)
+                written.set()
+                read_done.wait(5)
+            self.db_manager.release()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        written.wait(5)
+        # Транзакция еще не зафиксирована - видна старая строка
+        assert self.db_manager.get_book_by_id(book_id).available == 1
+        assert self.db_manager.search_books("книга")[0].available == 1
+        read_done.set()
+        thread.join()
+
+        assert self.db_manager.get_book_by_id(book_id).available == 0
+        assert self.db_manager.search_books("книга")[0].available == 0
+
+
+class TestPooledDatabaseManager:
+    """Тесты для PooledDatabaseManager"""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        self.db_manager = PooledDatabaseManager(self.temp_db.name, timeout=0.01,
+                                                retries=8, retry_delay=0.01)
+
+    def teardown_method(self):
+        self.db_manager.close()
+
+    def test_wal_mode(self):
+        """Тест включения журнала WAL"""
+        mode = self.db_manager.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_connection_per_thread(self):
+        """Тест отдельного соединения для каждого потока"""
+        main_conn = self.db_manager.conn
+        seen = []
+
+        def worker():
+            seen.append(self.db_manager.conn)
+            self.db_manager.release()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert seen[0] is not main_conn
+        assert self.db_manager.connection_count() == 1
+
+    def write_books(self, n, errors):
+        """Запись книг из одного потока со своим соединением"""
+        try:
+            for i in range(20):
+                with self.db_manager.transaction():
+                    book_id = self.db_manager.add_book(
+                        Book(f"Книга {n}-{i}", "Автор", f"{n}-{i}", 2020, 1)
+                    )
+                self.db_manager.decrement_available(book_id)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            self.db_manager.release()
+
+    def test_concurrent_writers(self):
+        """Тест одновременной записи из нескольких потоков"""
+        errors = []
+        threads = [
+            threading.Thread(target=self.write_books, args=(n, errors)) for n in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        books = self.db_manager.get_all_books()
+        assert len(books) == 80
+        assert all(book.available == 0 for book in books)
+
+    def test_retry_when_locked(self):
+        """Тест повтора записи, пока база заблокирована другим соединением"""
+        blocker = sqlite3.connect(self.temp_db.name, isolation_level=None,
+                                  check_same_thread=False)
+        blocker.execute("BEGIN IMMEDIATE")
+        timer = threading.Timer(0.1, blocker.commit)
+        timer.start()
+        try:
+            start = time.monotonic()
+            book_id = self.db_manager.add_book(Book("Книга", "Автор", "123-456", 2020, 1))
+            assert time.monotonic() - start >= 0.05
+        finally:
+            timer.join()
+            blocker.close()
+
+        assert self.db_manager.get_book_by_id(book_id).title == "Книга"
+
+    def test_memory_database_rejected(self):
+        """Тест запрета пула для базы в памяти"""
+        with pytest.raises(ValueError):
+            PooledDatabaseManager(":memory:")
+
+
+class TestGroupCommitWriter:
+    """Тесты для GroupCommitWriter"""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        self.db_manager = PooledDatabaseManager(self.temp_db.name)
+        self.writer = GroupCommitWriter(self.temp_db.name)
+
+    def teardown_method(self):
+        self.writer.close()
+        self.db_manager.close()
+
+    def test_submit_resolves_future(self):
+        """Тест записи через очередь с результатом во future"""
+        future = self.writer.submit("add_book", Book("Книга", "Автор", "123-456", 2020, 2))
+        book_id = future.result(timeout=5)
+
+        assert self.db_manager.get_book_by_id(book_id).title == "Книга"
+        assert self.writer.submit("decrement_available", book_id).result(timeout=5) == True
+
+    def test_writes_from_many_threads_are_batched(self):
+        """Тест группировки записей из разных потоков в общие транзакции"""
+        futures = []
+
+        def worker(n):
+            for i in range(25):
+                futures.append(self.writer.submit(
+                    "add_book", Book(f"Книга {n}-{i}", "Автор", f"{n}-{i}", 2020, 1)
+                ))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        book_ids = [future.result(timeout=5) for future in futures]
+
+        assert len(set(book_ids)) == 100
+        stats = self.writer.stats()
+        assert stats["operations"] == 100
+        assert stats["batches"] <= 100
+        assert stats["max_batch_size"] >= 1
+        assert stats["queue_depth"] == 0
+
+    def test_failed_operation_does_not_undo_batch(self):
+        """Тест того, что ошибка одной операции не отменяет остальные"""
+        def fail(db):
+            db.add_book(Book("Отмена", "Автор", "000", 2020, 1))
+            raise ValueError("Book is not available")
+
+        first = self.writer.submit("add_book", Book("Первая", "Автор", "111", 2020, 1))
+        failed = self.writer.submit(fail)
+        second = self.writer.submit("add_book", Book("Вторая", "Автор", "222", 2020, 1))
+
+        first.result(timeout=5)
+        second.result(timeout=5)
+        with pytest.raises(ValueError):
+            failed.result(timeout=5)
+        titles = {book.title for book in self.db_manager.get_all_books()}
+        assert titles == {"Первая", "Вторая"}
+
+    def test_close_flushes_pending_writes(self):
+        """Тест записи оставшихся операций при закрытии"""
+        futures = [
+            self.writer.submit("add_book", Book(f"Книга {i}", "Автор", f"isbn-{i}", 2020, 1))
+            for i in range(10)
+        ]
+        self.writer.close()
+
+        assert all(future.done() for future in futures)
+        assert len(self.db_manager.get_all_books()) == 10
+        with pytest.raises(RuntimeError):
+            self.writer.submit("add_book", Book("Книга", "Автор", "123", 2020, 1))
+
+
+class TestAsyncDatabaseManager:
+    """Тесты для AsyncDatabaseManager"""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+
+    def test_methods_are_coroutines(self):
+        """Тест асинхронного вызова методов менеджера"""
+        async def scenario():
+            async with AsyncDatabaseManager(self.temp_db.name, max_workers=2) as adb:
+                book_id = await adb.add_book(Book("Книга", "Автор", "123-456", 2020, 2))
+                book = await adb.get_book_by_id(book_id)
+                return book.title
+
+        assert asyncio.run(scenario()) == "Книга"
+
+    def test_run_keeps_transaction_on_one_worker(self):
+        """Тест выполнения транзакции целиком в одном рабочем потоке"""
+        def add_two(db):
+            with db.transaction():
+                db.add_book(Book("Первая", "Автор", "111", 2020, 1))
+                db.add_book(Book("Вторая", "Автор", "222", 2020, 1))
+
+        async def scenario():
+            async with AsyncDatabaseManager(self.temp_db.name) as adb:
+                await adb.run(add_two)
+                with pytest.raises(AttributeError):
+                    adb.transaction
+                return len(await adb.get_all_books())
+
+        assert asyncio.run(scenario()) == 2
+
+    def test_concurrent_calls_and_async_iteration(self):
+        """Тест параллельных запросов и асинхронного обхода больших выборок"""
+        async def scenario():
+            async with AsyncDatabaseManager(self.temp_db.name, max_workers=3) as adb:
+                await adb.add_books_many(
+                    Book(f"Книга {i}", "Автор", f"isbn-{i}", 2020, 1) for i in range(25)
+                )
+                books = await asyncio.gather(*(adb.get_book_by_id(i) for i in range(1, 26)))
+                streamed = [book.id async for book in adb.iter_books(batch_size=10)]
+                return [book.id for book in books], streamed
+
+        fetched, streamed = asyncio.run(scenario())
+        assert fetched == list(range(1, 26))
+        assert streamed == list(range(1, 26))
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
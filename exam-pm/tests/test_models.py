@@ -76,6 +76,24 @@ class TestBook:
         assert book_dict["quantity"] == 4
         assert book_dict["available"] == 4
 
+    def test_book_from_row(self):
+        """Тест создания книги из сохраненной строки без валидации"""
+        book = Book.from_row((7, "Война и мир", "Лев Толстой", "123-456", 1869, 5, 2))
+
+        assert book.id == 7
+        assert book.title == "Война и мир"
+        assert book.quantity == 5
+        assert book.available == 2
+        assert book.to_dict()["isbn"] == "123-456"
+
+    def test_book_has_no_instance_dict(self):
+        """Тест компактного представления книги через __slots__"""
+        book = Book("Книга", "Автор", "123-456", 2020, 1)
+
+        assert not hasattr(book, "__dict__")
+        with pytest.raises(AttributeError):
+            book.unknown = 1
+
     def test_book_validation(self):
         """Тест валидации данных книги"""
         # Тест с некорректным годом
@@ -127,6 +145,15 @@ class TestReader:
         assert reader_dict["phone"] == "+7-999-123-45-69"
         assert "registration_date" in reader_dict
 
+    def test_reader_from_row(self):
+        """Тест создания читателя из сохраненной строки без валидации"""
+        registered = datetime(2024, 1, 5, 10, 0, 0)
+        reader = Reader.from_row((3, "Иван", "ivan@example.com", "+7-1", registered))
+
+        assert reader.id == 3
+        assert reader.email == "ivan@example.com"
+        assert reader.registration_date == registered
+
     def test_reader_validation(self):
         """Тест валидации данных читателя"""
         # Тест с некорректным email
@@ -180,6 +207,28 @@ class TestLoan:
         loan = Loan(1, 1, loan_date, return_date)
         assert loan.is_overdue() == False
 
+    def test_loan_from_row(self):
+        """Тест создания выдачи из сохраненной строки"""
+        loan_date = datetime(2024, 1, 10, 9, 0, 0)
+        return_date = loan_date + timedelta(days=14)
+        loan = Loan.from_row((5, 1, 2, loan_date, return_date, True))
+
+        assert loan.id == 5
+        assert loan.book_id == 1
+        assert loan.reader_id == 2
+        assert loan.return_date == return_date
+        assert loan.is_returned == True
+        assert loan.is_overdue() == False
+
+    def test_loan_overdue_as_of(self):
+        """Тест проверки просрочки на заданный момент времени"""
+        loan_date = datetime(2024, 1, 10, 9, 0, 0)
+        loan = Loan(1, 1, loan_date, loan_date + timedelta(days=14))
+
+        assert loan.is_overdue(as_of=loan_date + timedelta(days=7)) == False
+        assert loan.is_overdue(as_of=loan_date + timedelta(days=15)) == True
+        assert loan.to_dict(as_of=loan_date + timedelta(days=15))["is_overdue"] == True
+
     def test_loan_to_dict(self):
         """Тест преобразования выдачи в словарь"""
         loan_date = datetime.now()
@@ -0,0 +1,130 @@
+import itertools
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+LOADER_WORKERS = 2
+POLL_MS = 25
+# Results handed to Tk callbacks per poll, so a fast stream of chunks cannot
+# starve input events
+RESULTS_PER_POLL = 8
+# Quiet time after the last keystroke before a search runs
+DEBOUNCE_MS = 300
+
+
+class BackgroundLoader:
+    # Runs view queries on worker threads so the Tk mainloop never waits on
+    # SQLite. The controllers must sit on a manager with per-thread
+    # connections (PooledDatabaseManager), which gives every worker its own.
+    # Results come back through a queue drained with after() on the Tk thread.
+    # Every job runs on a named channel, and submitting to a channel
+    # supersedes the job already there: a chunked job stops at its next
+    # chunk, and whatever a superseded job still delivers is dropped
+    def __init__(self, root, workers=LOADER_WORKERS, poll_ms=POLL_MS, on_busy=None) -> None:
+        self.root = root
+        self.poll_ms = poll_ms
+        self.on_busy = on_busy
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="loader")
+        self._results = queue.Queue()
+        self._tokens = itertools.count(1)
+        self._jobs = {}  # channel -> (token, on_result, on_chunk, on_error)
+        self._busy = False
+        self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, channel, job, on_result=None, on_chunk=None, on_error=None) -> int:
+        # job() runs on a worker. With on_chunk it must return an iterable,
+        # whose items are delivered one by one before on_result(None);
+        # otherwise on_result gets its return value
+        token = next(self._tokens)
+        self._jobs[channel] = (token, on_result, on_chunk, on_error)
+        self._executor.submit(self._run, channel, token, job, on_chunk is not None)
+        self._set_busy()
+        return token
+
+    def cancel(self, channel) -> None:
+        if self._jobs.pop(channel, None) is not None:
+            self._set_busy()
+
+    def is_current(self, channel, token) -> bool:
+        job = self._jobs.get(channel)
+        return job is not None and job[0] == token
+
+    def close(self) -> None:
+        self._jobs.clear()
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, channel, token, job, chunked) -> None:
+        if not self.is_current(channel, token):
+            return
+        try:
+            result = self._stream(channel, token, job()) if chunked else job()
+        except Exception as e:
+            self._results.put(("error", channel, token, e))
+        else:
+            self._results.put(("result", channel, token, result))
+
+    def _stream(self, channel, token, chunks) -> None:
+        for chunk in chunks:
+            if not self.is_current(channel, token):
+                return
+            self._results.put(("chunk", channel, token, chunk))
+
+    def _poll(self) -> None:
+        try:
+            for _ in range(RESULTS_PER_POLL):
+                self._deliver(*self._results.get_nowait())
+        except queue.Empty:
+            pass
+        finally:
+            # close() may have run from one of the callbacks
+            if self._after_id is not None:
+                self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def _deliver(self, kind, channel, token, value) -> None:
+        if not self.is_current(channel, token):
+            return
+        _, on_result, on_chunk, on_error = self._jobs[channel]
+        if kind == "chunk":
+            on_chunk(value)
+            return
+        del self._jobs[channel]
+        self._set_busy()
+        if kind == "result":
+            if on_result is not None:
+                on_result(value)
+        elif on_error is not None:
+            on_error(value)
+        else:
+            self.root.report_callback_exception(type(value), value, value.__traceback__)
+
+    def _set_busy(self) -> None:
+        busy = bool(self._jobs)
+        if busy != self._busy:
+            self._busy = busy
+            if self.on_busy is not None:
+                self.on_busy(busy)
+
+
+class Debouncer:
+    # Runs callback once the widget has seen no schedule() for delay_ms, so
+    # a burst of keystrokes costs one query
+    def __init__(self, widget, callback, delay_ms=DEBOUNCE_MS) -> None:
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self.callback = callback
+        self._after_id = None
+
+    def schedule(self, event=None) -> None:
+        self.cancel()
+        self._after_id = self.widget.after(self.delay_ms, self._fire)
+
+    def cancel(self) -> None:
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _fire(self) -> None:
+        self._after_id = None
+        self.callback()
@@ -1,13 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter.simpledialog import Dialog
+from views.virtual_tree import LiveSearch, VirtualTreeview
 
 class BookView(ttk.Frame):
-    def __init__(self, parent, book_controller) -> None:
+    def __init__(self, parent, book_controller, loader=None) -> None:
         super().__init__(parent)
         self.book_controller = book_controller
+        self.loader = loader
         self.create_widgets()
-        self.refresh_books()
+        self.live_search.refresh()
 
     def create_widgets(self) -> None:
         # Search frame
@@ -17,8 +19,11 @@ class BookView(ttk.Frame):
         self.search_entry = ttk.Entry(search_frame)
         self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
         
-        search_button = ttk.Button(search_frame, text="Search", command=self.refresh_books)
+        search_button = ttk.Button(search_frame, text="Search")
         search_button.pack(side=tk.LEFT)
+
+        more_button = ttk.Button(search_frame, text="Load more", state=tk.DISABLED)
+        more_button.pack(side=tk.LEFT, padx=(5, 0))
         
         # Buttons frame
         buttons_frame = ttk.Frame(self)
@@ -33,69 +38,59 @@ class BookView(ttk.Frame):
         delete_button = ttk.Button(buttons_frame, text="Delete Book", command=self.delete_selected)
         delete_button.pack(side=tk.LEFT)
         
-        # Books table
-        self.tree = ttk.Treeview(self, columns=("id", "title", "author", "year", "isbn", "quantity", "available"), show="headings")
-        self.tree.heading("id", text="ID")
-        self.tree.heading("title", text="Title")
-        self.tree.heading("author", text="Author")
-        self.tree.heading("year", text="Year")
-        self.tree.heading("isbn", text="ISBN")
-        self.tree.heading("quantity", text="Quantity")
-        self.tree.heading("available", text="Available")
-        
-        self.tree.column("id", width=50)
-        self.tree.column("title", width=150)
-        self.tree.column("author", width=150)
-        self.tree.column("year", width=70)
-        self.tree.column("isbn", width=120)
-        self.tree.column("quantity", width=70)
-        self.tree.column("available", width=70)
-        
-        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(self.tree, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Books table: only the rows on screen exist as Treeview items
+        self.table = VirtualTreeview(self, columns=(
+            ("id", "ID", 50),
+            ("title", "Title", 150),
+            ("author", "Author", 150),
+            ("year", "Year", 70),
+            ("isbn", "ISBN", 120),
+            ("quantity", "Quantity", 70),
+            ("available", "Available", 70)
+        ), row_values=lambda book: (
+            book.id,
+            book.title,
+            book.author,
+            book.year,
+            book.isbn,
+            book.quantity,
+            book.available
+        ), loader=self.loader, channel="books")
+        self.table.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-    def refresh_books(self) -> None:
-        query = self.search_entry.get()
-        books = self.book_controller.search_books(query) if query else self.book_controller.get_all_books()
-        
-        self.tree.delete(*self.tree.get_children())
-        for book in books:
-            self.tree.insert("", tk.END, values=(
-                book.id,
-                book.title,
-                book.author,
-                book.year,
-                book.isbn,
-                book.quantity,
-                book.available
-            ))
+        self.live_search = LiveSearch(
+            self.table, self.search_entry, more_button, self.book_controller.search_books,
+            self.book_controller.list_books, self.book_controller.count_books
+        )
+        search_button.config(command=self.live_search.refresh)
+
+    def book_changed(self, book_id) -> None:
+        # Another view changed this book (e.g. its available copies)
+        book = self.book_controller.get_book(book_id)
+        if book is not None:
+            self.table.update_row(book)
 
     def add_book(self) -> None:
         dialog = BookDialog(self, "Add Book")
         if dialog.result:
             try:
-                self.book_controller.add_book(
+                book_id = self.book_controller.add_book(
                     title=dialog.result["title"],
                     author=dialog.result["author"],
                     isbn=dialog.result["isbn"],
                     year=dialog.result["year"],
                     quantity=dialog.result["quantity"]
                 )
-                self.refresh_books()
+                self.live_search.row_added(self.book_controller.get_book(book_id))
             except Exception as e:
                 messagebox.showerror("Error", str(e))
 
     def edit_book(self) -> None:
-        selected = self.tree.selection()
-        if not selected:
+        book_id = self.table.selected_key()
+        if book_id is None:
             messagebox.showwarning("Warning", "Please select a book to edit")
             return
             
-        book_id = self.tree.item(selected[0])["values"][0]
         book = self.book_controller.get_book(book_id)
         if not book:
             messagebox.showerror("Error", "Book not found")
@@ -121,21 +116,20 @@ class BookView(ttk.Frame):
                     year=dialog.result["year"],
                     quantity=dialog.result["quantity"]
                 )
-                self.refresh_books()
+                self.table.update_row(self.book_controller.get_book(book_id))
             except Exception as e:
                 messagebox.showerror("Error", str(e))
 
     def delete_selected(self) -> None:
-        selected = self.tree.selection()
-        if not selected:
+        book_id = self.table.selected_key()
+        if book_id is None:
             messagebox.showwarning("Warning", "Please select a book to delete")
             return
             
-        book_id = self.tree.item(selected[0])["values"][0]
         if messagebox.askyesno("Confirm", "Are you sure you want to delete this book?"):
             try:
                 if self.book_controller.delete_book(book_id):
-                    self.refresh_books()
+                    self.table.remove_row(book_id)
                 else:
                     messagebox.showerror("Error", "Failed to delete book")
             except Exception as e:
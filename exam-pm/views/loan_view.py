@@ -2,13 +2,20 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter.simpledialog import Dialog
 from datetime import datetime, timedelta
+from operator import itemgetter
+from views.picker import TypeaheadPicker
+from views.virtual_tree import KeysetSource, VirtualTreeview
 
 class LoanView(ttk.Frame):
-    def __init__(self, parent, loan_controller, book_controller, reader_controller) -> None:
+    def __init__(self, parent, loan_controller, book_controller, reader_controller,
+                 loader=None, on_book_change=None) -> None:
         super().__init__(parent)
         self.loan_controller = loan_controller
         self.book_controller = book_controller
         self.reader_controller = reader_controller
+        self.loader = loader
+        # Called with a book id whenever a loan or return changes its stock
+        self.on_book_change = on_book_change
         self.create_widgets()
         self.refresh_loans()
 
@@ -37,101 +44,105 @@ class LoanView(ttk.Frame):
         return_button = ttk.Button(buttons_frame, text="Return Book", command=self.return_selected)
         return_button.pack(side=tk.LEFT)
         
-        # Loans table
-        self.tree = ttk.Treeview(self, columns=("id", "book_id", "reader_id", "loan_date", "return_date", "status"), show="headings")
-        self.tree.heading("id", text="ID")
-        self.tree.heading("book_id", text="Book ID")
-        self.tree.heading("reader_id", text="Reader ID")
-        self.tree.heading("loan_date", text="Loan Date")
-        self.tree.heading("return_date", text="Return Date")
-        self.tree.heading("status", text="Status")
-        
-        self.tree.column("id", width=50)
-        self.tree.column("book_id", width=70)
-        self.tree.column("reader_id", width=70)
-        self.tree.column("loan_date", width=150)
-        self.tree.column("return_date", width=150)
-        self.tree.column("status", width=100)
-        
-        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(self.tree, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Loans table: only the rows on screen exist as Treeview items
+        self.table = VirtualTreeview(self, columns=(
+            ("id", "ID", 50),
+            ("book", "Book", 150),
+            ("reader", "Reader", 120),
+            ("loan_date", "Loan Date", 150),
+            ("return_date", "Return Date", 150),
+            ("status", "Status", 100)
+        ), row_values=lambda loan: (
+            loan["id"],
+            f"{loan['book_id']}: {loan['book_title'] or '(deleted)'}",
+            f"{loan['reader_id']}: {loan['reader_name'] or '(deleted)'}",
+            loan["loan_date"].strftime("%Y-%m-%d %H:%M:%S"),
+            loan["return_date"].strftime("%Y-%m-%d %H:%M:%S"),
+            f"Overdue ({loan['days_overdue']} d)" if loan["status"] == "overdue"
+            else loan["status"].capitalize()
+        ), row_key=itemgetter("id"), loader=self.loader, channel="loans")
+        self.table.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-    def refresh_loans(self) -> None:
+    def _annotate(self, loans) -> list[dict]:
+        # One clock for the whole page
+        for loan, (status, days_overdue) in zip(loans, self.loan_controller.classify(loans)):
+            loan["status"] = status
+            loan["days_overdue"] = days_overdue
+        return loans
+
+    def _status_filter(self) -> str | None:
         filter_type = self.filter_var.get()
-        
-        if filter_type == "all":
-            loans = self.loan_controller.get_all_loans()
-        elif filter_type == "active":
-            loans = [loan for loan in self.loan_controller.get_all_loans() if not loan.is_returned]
-        elif filter_type == "overdue":
-            loans = self.loan_controller.get_overdue_loans()
-        elif filter_type == "returned":
-            loans = [loan for loan in self.loan_controller.get_all_loans() if loan.is_returned]
-        
-        self.tree.delete(*self.tree.get_children())
-        for loan in loans:
-            status = "Returned" if loan.is_returned else "Overdue" if loan.is_overdue() else "Active"
-            self.tree.insert("", tk.END, values=(
-                loan.id,
-                loan.book_id,
-                loan.reader_id,
-                loan.loan_date.strftime("%Y-%m-%d %H:%M:%S"),
-                loan.return_date.strftime("%Y-%m-%d %H:%M:%S"),
-                status
+        return None if filter_type == "all" else filter_type
+
+    def _apply_change(self, loan_id, is_new) -> None:
+        # Re-reads just this loan and adds, updates or drops its row
+        # depending on whether the filter's query would still list it
+        loan = self.loan_controller.get_loan_details(loan_id)
+        if loan is not None:
+            self._annotate([loan])
+            if self.on_book_change is not None:
+                self.on_book_change(loan["book_id"])
+        if loan is None or not self.loan_controller.matches_status(loan, self._status_filter()):
+            if not is_new:
+                self.table.remove_row(loan_id)
+        elif is_new:
+            self.table.insert_row(loan)
+        else:
+            self.table.update_row(loan)
+
+    def refresh_loans(self) -> None:
+        status_filter = self._status_filter()
+
+        def list_page(after_id, limit, offset):
+            return self._annotate(self.loan_controller.list_loan_details(
+                status=status_filter, limit=limit, after_id=after_id, offset=offset
             ))
 
+        self.table.set_source(KeysetSource(
+            list_page, lambda: self.loan_controller.count_loans(status=status_filter),
+            key=itemgetter("id")
+        ))
+
     def create_loan(self) -> None:
-        dialog = LoanDialog(self, "Create Loan", self.book_controller, self.reader_controller)
+        dialog = LoanDialog(self, "Create Loan", self.book_controller, self.reader_controller,
+                            self.loader)
         if dialog.result:
             try:
-                self.loan_controller.create_loan(
+                loan_id = self.loan_controller.checkout(
                     book_id=dialog.result["book_id"],
                     reader_id=dialog.result["reader_id"],
                     loan_date=dialog.result["loan_date"],
                     return_date=dialog.result["return_date"]
                 )
-                # Update book availability
-                self.book_controller.borrow_book(dialog.result["book_id"])
-                self.refresh_loans()
+                self._apply_change(loan_id, is_new=True)
             except Exception as e:
                 messagebox.showerror("Error", str(e))
 
     def return_selected(self) -> None:
-        selected = self.tree.selection()
-        if not selected:
+        loan = self.table.selected_record()
+        if loan is None:
             messagebox.showwarning("Warning", "Please select a loan to return")
             return
             
-        loan_id = self.tree.item(selected[0])["values"][0]
-        loan = self.loan_controller.get_loan(loan_id)
-        if not loan:
-            messagebox.showerror("Error", "Loan not found")
-            return
-            
-        if loan.is_returned:
+        if loan["status"] == "returned":
             messagebox.showinfo("Info", "This book has already been returned")
             return
             
         if messagebox.askyesno("Confirm", "Are you sure you want to mark this book as returned?"):
             try:
-                if self.loan_controller.return_book(loan_id):
-                    # Update book availability
-                    self.book_controller.return_book(loan.book_id)
-                    self.refresh_loans()
+                if self.loan_controller.checkin(loan["id"]):
+                    self._apply_change(loan["id"], is_new=False)
                 else:
                     messagebox.showerror("Error", "Failed to return book")
             except Exception as e:
                 messagebox.showerror("Error", str(e))
 
 class LoanDialog(Dialog):
-    def __init__(self, parent, title, book_controller, reader_controller):
+    def __init__(self, parent, title, book_controller, reader_controller, loader=None):
         self.result = None
         self.book_controller = book_controller
         self.reader_controller = reader_controller
+        self.loader = loader
         super().__init__(parent, title)
         
     def body(self, master):
@@ -140,30 +151,21 @@ class LoanDialog(Dialog):
         ttk.Label(master, text="Loan Date:").grid(row=2, sticky=tk.W, padx=5, pady=5)
         ttk.Label(master, text="Return Date:").grid(row=3, sticky=tk.W, padx=5, pady=5)
         
-        # Book combobox
-        self.book_var = tk.StringVar()
-        self.book_combobox = ttk.Combobox(master, textvariable=self.book_var, state="readonly")
-        self.book_combobox.grid(row=0, column=1, sticky=tk.EW, padx=5, pady=5)
-        
-        # Populate books
-        books = self.book_controller.get_all_books()
-        available_books = [book for book in books if book.is_available()]
-        book_options = [f"{book.id}: {book.title} by {book.author}" for book in available_books]
-        self.book_combobox["values"] = book_options
-        if book_options:
-            self.book_combobox.current(0)
-        
-        # Reader combobox
-        self.reader_var = tk.StringVar()
-        self.reader_combobox = ttk.Combobox(master, textvariable=self.reader_var, state="readonly")
-        self.reader_combobox.grid(row=1, column=1, sticky=tk.EW, padx=5, pady=5)
-        
-        # Populate readers
-        readers = self.reader_controller.get_all_readers()
-        reader_options = [f"{reader.id}: {reader.name}" for reader in readers]
-        self.reader_combobox["values"] = reader_options
-        if reader_options:
-            self.reader_combobox.current(0)
+        # Book picker: available books by ISBN or title prefix
+        self.book_picker = TypeaheadPicker(
+            master, self.book_controller.search_available_books,
+            lambda book: f"{book.id}: {book.title} by {book.author} ({book.isbn})",
+            loader=self.loader, channel="loan-dialog-books"
+        )
+        self.book_picker.grid(row=0, column=1, sticky=tk.EW, padx=5, pady=5)
+        
+        # Reader picker: by id, or name/email/phone prefix
+        self.reader_picker = TypeaheadPicker(
+            master, self.reader_controller.find_readers,
+            lambda reader: f"{reader.id}: {reader.name} <{reader.email}>",
+            loader=self.loader, channel="loan-dialog-readers"
+        )
+        self.reader_picker.grid(row=1, column=1, sticky=tk.EW, padx=5, pady=5)
         
         # Loan date (default today)
         self.loan_date_var = tk.StringVar(value=datetime.now().strftime("%Y-%m-%d"))
@@ -173,21 +175,21 @@ class LoanDialog(Dialog):
         self.return_date_var = tk.StringVar(value=(datetime.now() + timedelta(days=14)).strftime("%Y-%m-%d"))
         ttk.Entry(master, textvariable=self.return_date_var).grid(row=3, column=1, sticky=tk.EW, padx=5, pady=5)
         
-        return self.book_combobox  # initial focus
+        return self.book_picker.entry  # initial focus
     
     def validate(self):
         try:
             # Get book ID
-            book_text = self.book_var.get()
-            if not book_text:
+            book = self.book_picker.chosen()
+            if book is None:
                 raise ValueError("Please select a book")
-            book_id = int(book_text.split(":")[0])
+            book_id = book.id
             
             # Get reader ID
-            reader_text = self.reader_var.get()
-            if not reader_text:
+            reader = self.reader_picker.chosen()
+            if reader is None:
                 raise ValueError("Please select a reader")
-            reader_id = int(reader_text.split(":")[0])
+            reader_id = reader.id
             
             # Parse dates
             loan_date = datetime.strptime(self.loan_date_var.get(), "%Y-%m-%d")
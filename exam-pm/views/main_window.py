@@ -3,6 +3,7 @@ from tkinter import ttk
 from views.book_view import BookView
 from views.reader_view import ReaderView
 from views.loan_view import LoanView
+from views.background_loader import BackgroundLoader
 
 class MainWindow(tk.Tk):
     def __init__(self, book_controller, reader_controller, loan_controller) -> None:
@@ -13,20 +14,45 @@ class MainWindow(tk.Tk):
         self.book_controller = book_controller
         self.reader_controller = reader_controller
         self.loan_controller = loan_controller
+        # Queries run on loader threads, so the controllers' manager needs
+        # per-thread connections (see PooledCachingDatabaseManager)
+        self.loader = BackgroundLoader(self, on_busy=self.show_loading)
         
         self.create_widgets()
         
     def create_widgets(self):
+        # Status bar with the loading indicator
+        self.status_bar = ttk.Frame(self)
+        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.loading_label = ttk.Label(self.status_bar, text="")
+        self.loading_label.pack(side=tk.LEFT, padx=5)
+        self.loading_bar = ttk.Progressbar(self.status_bar, mode="indeterminate", length=100)
+
         # Create notebook (tabs)
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill=tk.BOTH, expand=True)
         
         # Create tabs
-        self.book_tab = BookView(self.notebook, self.book_controller)
-        self.reader_tab = ReaderView(self.notebook, self.reader_controller)
-        self.loan_tab = LoanView(self.notebook, self.loan_controller, self.book_controller, self.reader_controller)
+        self.book_tab = BookView(self.notebook, self.book_controller, self.loader)
+        self.reader_tab = ReaderView(self.notebook, self.reader_controller, self.loader)
+        self.loan_tab = LoanView(self.notebook, self.loan_controller, self.book_controller, self.reader_controller,
+                                 self.loader, on_book_change=self.book_tab.book_changed)
         
         # Add tabs to notebook
         self.notebook.add(self.book_tab, text="Books")
         self.notebook.add(self.reader_tab, text="Readers")
-        self.notebook.add(self.loan_tab, text="Loans")
\ No newline at end of file
+        self.notebook.add(self.loan_tab, text="Loans")
+
+    def show_loading(self, busy) -> None:
+        if busy:
+            self.loading_label.config(text="Loading…")
+            self.loading_bar.pack(side=tk.LEFT, padx=5)
+            self.loading_bar.start(10)
+        else:
+            self.loading_label.config(text="")
+            self.loading_bar.stop()
+            self.loading_bar.pack_forget()
+
+    def destroy(self):
+        self.loader.close()
+        super().destroy()
@@ -0,0 +1,96 @@
+import tkinter as tk
+from tkinter import ttk
+from views.background_loader import Debouncer
+
+# Matches shown under a picker; every lookup asks for no more than this
+PICKER_LIMIT = 20
+PICKER_ROWS = 6
+
+
+class TypeaheadPicker(ttk.Frame):
+    # Entry with a short list of matches under it. Typing runs
+    # search(text, limit) once typing pauses, on the loader when there is
+    # one; a newer lookup supersedes a pending one. The highlighted match is
+    # .selected; chosen() returns it only while the entry still holds the
+    # text it was found for
+    def __init__(self, parent, search, describe, loader=None, channel=None,
+                 limit=PICKER_LIMIT, rows=PICKER_ROWS) -> None:
+        super().__init__(parent)
+        self.search = search
+        self.describe = describe
+        self.loader = loader
+        self.channel = channel or f"picker-{id(self)}"
+        self.limit = limit
+        self.records = []
+        self.selected = None
+        self._text = None
+        self._shown = None  # text the listed matches were found for
+
+        self.entry = ttk.Entry(self)
+        self.entry.pack(fill=tk.X)
+        self.listbox = tk.Listbox(self, height=rows, exportselection=False)
+        self.listbox.pack(fill=tk.BOTH, expand=True, pady=(2, 0))
+
+        self._delay = Debouncer(self, self.lookup)
+        self.entry.bind("<KeyRelease>", self._on_key)
+        self.entry.bind("<Down>", lambda event: self._move(1))
+        self.entry.bind("<Up>", lambda event: self._move(-1))
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        self.lookup()
+
+    def chosen(self):
+        if self._shown != self.entry.get().strip():
+            return None
+        return self.selected
+
+    def lookup(self) -> None:
+        text = self.entry.get().strip()
+        if text == self._text:
+            return
+        self._text = text
+        if self.loader is None:
+            self._show(self.search(text, self.limit), text)
+        else:
+            self.loader.submit(self.channel, lambda: self.search(text, self.limit),
+                               on_result=lambda records: self._show(records, text))
+
+    def _on_key(self, event) -> None:
+        # Matches for the old text must not survive an edit, even before the
+        # new lookup runs
+        if self.entry.get().strip() != self._shown:
+            self._text = None
+            if self.loader is not None:
+                self.loader.cancel(self.channel)
+            self._show([], None)
+        self._delay.schedule()
+
+    def _show(self, records, text) -> None:
+        self._shown = text
+        self.records = list(records)
+        self.listbox.delete(0, tk.END)
+        for record in self.records:
+            self.listbox.insert(tk.END, self.describe(record))
+        self._select(0 if self.records else None)
+
+    def _select(self, index) -> None:
+        self.listbox.selection_clear(0, tk.END)
+        self.selected = None if index is None else self.records[index]
+        if index is not None:
+            self.listbox.selection_set(index)
+            self.listbox.see(index)
+
+    def _move(self, step) -> str:
+        if self.records:
+            current = self.records.index(self.selected) if self.selected in self.records else 0
+            self._select(max(0, min(current + step, len(self.records) - 1)))
+        return "break"
+
+    def _on_select(self, event) -> None:
+        selection = self.listbox.curselection()
+        self.selected = self.records[selection[0]] if selection else None
+
+    def destroy(self) -> None:
+        self._delay.cancel()
+        if self.loader is not None:
+            self.loader.cancel(self.channel)
+        super().destroy()
@@ -1,13 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter.simpledialog import Dialog
+from views.virtual_tree import LiveSearch, VirtualTreeview
 
 class ReaderView(ttk.Frame):
-    def __init__(self, parent, reader_controller) -> None:
+    def __init__(self, parent, reader_controller, loader=None) -> None:
         super().__init__(parent)
         self.reader_controller = reader_controller
+        self.loader = loader
         self.create_widgets()
-        self.refresh_readers()
+        self.live_search.refresh()
 
     def create_widgets(self) -> None:
         # Search frame
@@ -17,8 +19,11 @@ class ReaderView(ttk.Frame):
         self.search_entry = ttk.Entry(search_frame)
         self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
         
-        search_button = ttk.Button(search_frame, text="Search", command=self.refresh_readers)
+        search_button = ttk.Button(search_frame, text="Search")
         search_button.pack(side=tk.LEFT)
+
+        more_button = ttk.Button(search_frame, text="Load more", state=tk.DISABLED)
+        more_button.pack(side=tk.LEFT, padx=(5, 0))
         
         # Buttons frame
         buttons_frame = ttk.Frame(self)
@@ -33,71 +38,47 @@ class ReaderView(ttk.Frame):
         delete_button = ttk.Button(buttons_frame, text="Delete Reader", command=self.delete_selected)
         delete_button.pack(side=tk.LEFT)
         
-        # Readers table
-        self.tree = ttk.Treeview(self, columns=("id", "name", "email", "phone", "registration_date"), show="headings")
-        self.tree.heading("id", text="ID")
-        self.tree.heading("name", text="Name")
-        self.tree.heading("email", text="Email")
-        self.tree.heading("phone", text="Phone")
-        self.tree.heading("registration_date", text="Registration Date")
-        
-        self.tree.column("id", width=50)
-        self.tree.column("name", width=150)
-        self.tree.column("email", width=200)
-        self.tree.column("phone", width=120)
-        self.tree.column("registration_date", width=150)
-        
-        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(self.tree, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Readers table: only the rows on screen exist as Treeview items
+        self.table = VirtualTreeview(self, columns=(
+            ("id", "ID", 50),
+            ("name", "Name", 150),
+            ("email", "Email", 200),
+            ("phone", "Phone", 120),
+            ("registration_date", "Registration Date", 150)
+        ), row_values=lambda reader: (
+            reader.id,
+            reader.name,
+            reader.email,
+            reader.phone,
+            reader.registration_date.strftime("%Y-%m-%d %H:%M:%S")
+        ), loader=self.loader, channel="readers")
+        self.table.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-    def refresh_readers(self) -> None:
-        query = self.search_entry.get()
-        readers = self.reader_controller.get_all_readers()
-        
-        # Filter by query if provided
-        if query:
-            query = query.lower()
-            readers = [
-                r for r in readers 
-                if query in r.name.lower() 
-                or query in r.email.lower() 
-                or query in r.phone.lower()
-            ]
-        
-        self.tree.delete(*self.tree.get_children())
-        for reader in readers:
-            self.tree.insert("", tk.END, values=(
-                reader.id,
-                reader.name,
-                reader.email,
-                reader.phone,
-                reader.registration_date.strftime("%Y-%m-%d %H:%M:%S")
-            ))
+        self.live_search = LiveSearch(
+            self.table, self.search_entry, more_button, self.reader_controller.search_readers,
+            self.reader_controller.list_readers, self.reader_controller.count_readers
+        )
+        search_button.config(command=self.live_search.refresh)
 
     def add_reader(self) -> None:
         dialog = ReaderDialog(self, "Add Reader")
         if dialog.result:
             try:
-                self.reader_controller.add_reader(
+                reader_id = self.reader_controller.add_reader(
                     name=dialog.result["name"],
                     email=dialog.result["email"],
                     phone=dialog.result["phone"]
                 )
-                self.refresh_readers()
+                self.live_search.row_added(self.reader_controller.get_reader(reader_id))
             except Exception as e:
                 messagebox.showerror("Error", str(e))
 
     def edit_reader(self) -> None:
-        selected = self.tree.selection()
-        if not selected:
+        reader_id = self.table.selected_key()
+        if reader_id is None:
             messagebox.showwarning("Warning", "Please select a reader to edit")
             return
             
-        reader_id = self.tree.item(selected[0])["values"][0]
         reader = self.reader_controller.get_reader(reader_id)
         if not reader:
             messagebox.showerror("Error", "Reader not found")
@@ -119,21 +100,20 @@ class ReaderView(ttk.Frame):
                     email=dialog.result["email"],
                     phone=dialog.result["phone"]
                 )
-                self.refresh_readers()
+                self.table.update_row(self.reader_controller.get_reader(reader_id))
             except Exception as e:
                 messagebox.showerror("Error", str(e))
 
     def delete_selected(self) -> None:
-        selected = self.tree.selection()
-        if not selected:
+        reader_id = self.table.selected_key()
+        if reader_id is None:
             messagebox.showwarning("Warning", "Please select a reader to delete")
             return
             
-        reader_id = self.tree.item(selected[0])["values"][0]
         if messagebox.askyesno("Confirm", "Are you sure you want to delete this reader?"):
             try:
                 if self.reader_controller.delete_reader(reader_id):
-                    self.refresh_readers()
+                    self.table.remove_row(reader_id)
                 else:
                     messagebox.showerror("Error", "Failed to delete reader")
             except Exception as e:
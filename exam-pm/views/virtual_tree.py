@@ -0,0 +1,499 @@
+import bisect
+import threading
+import tkinter as tk
+from collections import OrderedDict
+from operator import attrgetter
+from tkinter import ttk
+from views.background_loader import DEBOUNCE_MS, Debouncer
+
+ROW_PAGE_SIZE = 200
+CACHED_PAGES = 16
+WHEEL_ROWS = 3
+# Used until the first rendered row can be measured
+DEFAULT_ROW_HEIGHT = 20
+PENDING_TEXT = "…"
+# Search results are read this many at a time
+SEARCH_BATCH = 100
+
+
+class KeysetSource:
+    # Offset-addressed rows over a keyset-paginated listing,
+    # list_page(after_id, limit, offset). The key that ends every fetched
+    # page is remembered, so a page next to one already seen is a range scan
+    # from that key instead of an OFFSET counted from the first row.
+    # Sources may be read from loader threads, so calls are serialized
+    def __init__(self, list_page, count, key=attrgetter("id")) -> None:
+        self._list_page = list_page
+        self._count = count
+        self._key = key
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._offsets = [0]
+            self._keys = [0]
+
+    def count(self) -> int:
+        return self._count()
+
+    def fetch(self, offset, limit) -> list:
+        with self._lock:
+            anchor = bisect.bisect_right(self._offsets, offset) - 1
+            rows = self._list_page(self._keys[anchor], limit, offset - self._offsets[anchor])
+            end = offset + len(rows)
+            position = bisect.bisect_left(self._offsets, end)
+            if rows and (position == len(self._offsets) or self._offsets[position] != end):
+                self._offsets.insert(position, end)
+                self._keys.insert(position, self._key(rows[-1]))
+            return rows
+
+    # Row changes applied by the table. An anchor (offset, key) says rows
+    # after key start at offset, so it moves when a row at or before key
+    # comes or goes
+
+    def inserted(self, index, record) -> None:
+        self._shift(self._key(record), 1)
+
+    def removed(self, index, record) -> None:
+        self._shift(self._key(record), -1)
+
+    def updated(self, index, record) -> None:
+        pass
+
+    def _shift(self, key, step) -> None:
+        with self._lock:
+            for position, anchor_key in enumerate(self._keys):
+                if position and anchor_key >= key:
+                    self._offsets[position] += step
+
+
+class ListSource:
+    # Small result sets loaded in one call, such as capped search results
+    def __init__(self, load) -> None:
+        self._load = load
+        self._lock = threading.Lock()
+        self.rows = None
+
+    def reset(self) -> None:
+        self.rows = None
+
+    def count(self) -> int:
+        with self._lock:
+            if self.rows is None:
+                self.rows = list(self._load())
+            return len(self.rows)
+
+    def fetch(self, offset, limit) -> list:
+        return self.rows[offset:offset + limit]
+
+    def inserted(self, index, record) -> None:
+        self.rows.insert(index, record)
+
+    def removed(self, index, record) -> None:
+        del self.rows[index]
+
+    def updated(self, index, record) -> None:
+        self.rows[index] = record
+
+
+class SearchSource(ListSource):
+    # Capped search results, search(limit, offset). more() raises the cap by
+    # a batch; the next count() without a reset reads only the new batch
+    def __init__(self, search, batch=SEARCH_BATCH) -> None:
+        super().__init__(None)
+        self._search = search
+        self.batch = batch
+        self.limit = batch
+        self.has_more = False
+
+    def more(self) -> None:
+        self.limit += self.batch
+
+    def count(self) -> int:
+        with self._lock:
+            if self.rows is None:
+                self.rows = []
+                self.has_more = True
+            if self.has_more and len(self.rows) < self.limit:
+                wanted = self.limit - len(self.rows)
+                batch = self._search(wanted, len(self.rows))
+                self.rows.extend(batch)
+                self.has_more = len(batch) == wanted
+            return len(self.rows)
+
+
+class LiveSearch:
+    # Search box over a VirtualTreeview, shared by the list views. Typing
+    # searches once it pauses and Return searches at once: a query reads
+    # search(query, limit, offset) in SearchSource batches, an empty box the
+    # whole listing, list_page(after_id, limit, offset) and count(). The
+    # more button asks the search for its next batch
+    def __init__(self, table, entry, more_button, search, list_page, count,
+                 delay_ms=DEBOUNCE_MS) -> None:
+        self.table = table
+        self.entry = entry
+        self.more_button = more_button
+        self._search = search
+        self._list_page = list_page
+        self._count = count
+        self.query = ""
+        self._delay = Debouncer(entry, self._changed, delay_ms)
+        entry.bind("<KeyRelease>", self._delay.schedule)
+        entry.bind("<Return>", lambda event: self.refresh())
+        more_button.config(command=self.load_more)
+        table.on_refresh = self.update_more_button
+
+    def refresh(self) -> None:
+        self._delay.cancel()
+        query = self.entry.get().strip()
+        self.query = query
+        if query:
+            source = SearchSource(lambda limit, offset: self._search(query, limit, offset))
+        else:
+            source = KeysetSource(self._list_page, self._count)
+        self.table.set_source(source)
+
+    def _changed(self) -> None:
+        # Keys that leave the text as it was (arrows, Enter) do not search
+        if self.entry.get().strip() != self.query:
+            self.refresh()
+
+    def row_added(self, record) -> None:
+        # Search results are re-run; the full list just gains a row
+        if self.query:
+            self.table.refresh()
+        else:
+            self.table.insert_row(record)
+
+    def load_more(self) -> None:
+        source = self.table.source
+        if isinstance(source, SearchSource) and source.has_more:
+            source.more()
+            self.table.refresh(reset=False)
+
+    def update_more_button(self) -> None:
+        source = self.table.source
+        more = isinstance(source, SearchSource) and source.has_more
+        self.more_button.config(state=tk.NORMAL if more else tk.DISABLED)
+
+
+class VirtualTreeview(ttk.Frame):
+    # Treeview that holds Tk items only for the rows on screen. Rows come from
+    # a source (count() and fetch(offset, limit)) a page at a time and the
+    # last few pages are cached; the scrollbar reflects the source's total
+    # row count. Item ids are the records' keys, and insert_row, update_row
+    # and remove_row apply a single change without reloading the table.
+    # With a BackgroundLoader the source is only read on loader threads: rows
+    # of pages still loading show as placeholders and are filled in as the
+    # pages arrive, and a newer request on the table's channel supersedes
+    # the pending one
+    def __init__(self, parent, columns, row_values, row_key=attrgetter("id"),
+                 page_size=ROW_PAGE_SIZE, loader=None, channel=None, on_refresh=None) -> None:
+        super().__init__(parent)
+        self.row_values = row_values
+        self.row_key = row_key
+        self.page_size = page_size
+        self.loader = loader
+        # Called once a refresh has the new row count
+        self.on_refresh = on_refresh
+        self.channel = channel or f"table-{id(self)}"
+        self.source = None
+        self.total = 0
+        self.first = 0
+        self._visible = 1
+        self._pages = OrderedDict()
+        self._window = {}  # iid -> (row index, record) of the rendered rows
+        self._selected_key = None
+        self._selected_index = None
+        self._reloading = False
+        self._requested = frozenset()
+
+        self.tree = ttk.Treeview(self, columns=[name for name, _, _ in columns],
+                                 show="headings", selectmode="browse")
+        for name, heading, width in columns:
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", lambda event: self._render())
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(WHEEL_ROWS))
+        self.tree.bind("<Up>", lambda event: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self._move_selection(-self._visible))
+        self.tree.bind("<Next>", lambda event: self._move_selection(self._visible))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+    def set_source(self, source) -> None:
+        self.source = source
+        self.first = self.total = 0
+        self._pages.clear()
+        self._selected_key = self._selected_index = None
+        self.refresh()
+
+    def refresh(self, reset=True) -> None:
+        # Re-reads the row count and drops cached pages; the scroll position
+        # and selection are kept where possible. reset=False keeps what the
+        # source already holds (a search that was asked for more rows)
+        if self.loader is not None and self.source is not None:
+            self._reload(reset)
+            return
+        self._pages.clear()
+        self.total = 0
+        if self.source is not None:
+            if reset:
+                self.source.reset()
+            self.total = self.source.count()
+        self._render()
+        self._refreshed()
+
+    def _refreshed(self) -> None:
+        if self.on_refresh is not None:
+            self.on_refresh()
+
+    def _reload(self, reset=True) -> None:
+        # The count and the pages on screen come back as one chunk, so the
+        # old rows stay up until the new ones can replace them
+        source, first, visible, size = self.source, self.first, self._visible, self.page_size
+
+        def job():
+            if reset:
+                source.reset()
+            total = source.count()
+            start = max(0, min(first, total - visible))
+            pages = range(start // size, (min(total, start + visible) - 1) // size + 1)
+            yield total, {page: source.fetch(page * size, size) for page in pages}
+
+        self._reloading = True
+        self._requested = frozenset()
+        self.loader.submit(self.channel, job, on_result=self._on_loaded,
+                           on_chunk=self._on_reloaded, on_error=self._on_failed)
+
+    def _on_reloaded(self, chunk) -> None:
+        self.total, pages = chunk
+        self._reloading = False
+        self._pages.clear()
+        for page, rows in pages.items():
+            self._store(page, rows)
+        self._render()
+        self._refreshed()
+
+    def _request(self, pages) -> None:
+        source, size = self.source, self.page_size
+
+        def job():
+            for page in pages:
+                yield page, source.fetch(page * size, size)
+
+        self._requested = frozenset(pages)
+        self.loader.submit(self.channel, job, on_result=self._on_loaded,
+                           on_chunk=self._on_page, on_error=self._on_failed)
+
+    def _on_page(self, chunk) -> None:
+        self._store(*chunk)
+        self._render()
+
+    def _on_loaded(self, result) -> None:
+        self._reloading = False
+        self._requested = frozenset()
+
+    def _on_failed(self, error) -> None:
+        # Lets the next render ask again; Tk reports the error
+        self._on_loaded(None)
+        raise error
+
+    def insert_row(self, record) -> None:
+        # Appends a new record after the last row; sources are ordered by
+        # key, so a record with a fresh id belongs there
+        if self._loading():
+            self.refresh()
+            return
+        index = self.total
+        self.total += 1
+        self.source.inserted(index, record)
+        page, offset = divmod(index, self.page_size)
+        rows = self._pages.get(page)
+        if rows is not None and len(rows) == offset:
+            rows.append(record)
+        self._render()
+
+    def update_row(self, record) -> None:
+        # Replaces the record if it is cached; uncached pages are read fresh
+        # when they are next shown
+        if self._loading():
+            self.refresh()
+            return
+        index = self._find(self.row_key(record))
+        if index is None:
+            return
+        page, offset = divmod(index, self.page_size)
+        self._pages[page][offset] = record
+        self.source.updated(index, record)
+        iid = str(self.row_key(record))
+        if iid in self._window:
+            self.tree.item(iid, values=self.row_values(record))
+            self._window[iid] = (index, record)
+
+    def remove_row(self, key) -> None:
+        index = None if self._loading() else self._find(key)
+        if index is None:
+            self.refresh()
+            return
+        record = self._take(index)
+        self.source.removed(index, record)
+        if self._selected_key == key:
+            self._selected_key = self._selected_index = None
+        elif self._selected_index is not None and self._selected_index > index:
+            self._selected_index -= 1
+        self._render()
+
+    def _take(self, index):
+        page, offset = divmod(index, self.page_size)
+        rows = self._pages[page]
+        record = rows.pop(offset)
+        # Following cached pages move up by one row; past a page that is not
+        # cached the rows to carry over are unknown, so later pages are dropped
+        while (following := self._pages.get(page + 1)) is not None:
+            if following:
+                rows.append(following.pop(0))
+            page, rows = page + 1, following
+        self.total -= 1
+        for later in [later for later in self._pages if later > page]:
+            del self._pages[later]
+        if len(rows) < min(self.page_size, self.total - page * self.page_size):
+            del self._pages[page]
+        return record
+
+    def _loading(self) -> bool:
+        # A page being read now may not include the change; reload instead
+        return self.source is None or self._reloading or bool(self._requested)
+
+    def _find(self, key):
+        entry = self._window.get(str(key))
+        if entry is not None:
+            return entry[0]
+        for page, rows in self._pages.items():
+            for offset, record in enumerate(rows):
+                if self.row_key(record) == key:
+                    return page * self.page_size + offset
+        return None
+
+    def selected_record(self):
+        selection = self.tree.selection()
+        entry = self._window.get(selection[0]) if selection else None
+        return entry[1] if entry else None
+
+    def selected_key(self):
+        record = self.selected_record()
+        return None if record is None else self.row_key(record)
+
+    def scroll(self, rows) -> str:
+        self._scroll_to(self.first + rows)
+        return "break"
+
+    def _scroll_to(self, first) -> None:
+        self.first = first
+        self._render()
+
+    def _on_scrollbar(self, action, amount, unit=None) -> None:
+        if action == "moveto":
+            self._scroll_to(int(float(amount) * self.total))
+        elif action == "scroll":
+            step = self._visible if unit == "pages" else 1
+            self._scroll_to(self.first + int(amount) * step)
+
+    def _on_wheel(self, event) -> str:
+        return self.scroll(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS)
+
+    def _on_select(self, event) -> None:
+        entry = self.selected_record()
+        if entry is not None:
+            self._selected_key = self.row_key(entry)
+            self._selected_index = self._window[self.tree.selection()[0]][0]
+
+    def _move_selection(self, step) -> str:
+        if not self.total:
+            return "break"
+        current = self._selected_index
+        index = 0 if current is None else max(0, min(current + step, self.total - 1))
+        record = self._record(index)
+        if record is not None:
+            self._selected_key, self._selected_index = self.row_key(record), index
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self._visible:
+            self.first = index - self._visible + 1
+        self._render()
+        return "break"
+
+    def _visible_rows(self) -> int:
+        children = self.tree.get_children()
+        bbox = self.tree.bbox(children[0]) if children else None
+        top, row_height = (bbox[1], bbox[3]) if bbox else (DEFAULT_ROW_HEIGHT, DEFAULT_ROW_HEIGHT)
+        return max(1, (self.tree.winfo_height() - top) // max(1, row_height))
+
+    def _render(self) -> None:
+        self._visible = self._visible_rows()
+        self.first = max(0, min(self.first, self.total - self._visible))
+        end = min(self.total, self.first + self._visible)
+        rows = [(index, self._record(index)) for index in range(self.first, end)]
+        self._request_missing(range(self.first, end))
+
+        self.tree.delete(*self.tree.get_children())
+        self._window = {}
+        for index, record in rows:
+            if record is None:
+                self._insert_pending(index)
+                continue
+            iid = str(self.row_key(record))
+            self.tree.insert("", tk.END, iid=iid, values=self.row_values(record))
+            self._window[iid] = (index, record)
+        selected = str(self._selected_key)
+        if selected in self._window:
+            self.tree.selection_set(selected)
+            self.tree.focus(selected)
+
+        if self.total:
+            self.scrollbar.set(self.first / self.total, end / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+        # The row height is only known once a row is drawn
+        if rows and self._visible_rows() != self._visible:
+            self.after_idle(self._render)
+
+    def _insert_pending(self, index) -> None:
+        if self.loader is not None:
+            self.tree.insert("", tk.END, iid=f"pending-{index}", values=(PENDING_TEXT,))
+
+    def _request_missing(self, indexes) -> None:
+        if self.loader is None or self._reloading or not indexes:
+            return
+        pages = range(indexes[0] // self.page_size, (indexes[-1]) // self.page_size + 1)
+        missing = [page for page in pages if page not in self._pages]
+        if missing and not self._requested.issuperset(missing):
+            self._request(missing)
+
+    def _record(self, index):
+        page, offset = divmod(index, self.page_size)
+        rows = self._page(page)
+        return rows[offset] if rows is not None and offset < len(rows) else None
+
+    def _page(self, page) -> list | None:
+        rows = self._pages.get(page)
+        if rows is not None:
+            self._pages.move_to_end(page)
+            return rows
+        if self.loader is not None:
+            return None
+        return self._store(page, self.source.fetch(page * self.page_size, self.page_size))
+
+    def _store(self, page, rows) -> list:
+        self._pages[page] = rows
+        self._pages.move_to_end(page)
+        while len(self._pages) > CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return rows